@@ -0,0 +1,164 @@
+"""Non-blocking animations for the Tk views.
+
+Views never sleep between updates. They queue steps (callables) and colour
+effects on an ``AnimationScheduler``, which plays them back from
+``root.after`` callbacks, so the event loop keeps running and the window stays
+interactive while an animation plays.
+
+Steps play at the pace of the selected speed (see ``SPEEDS``). When steps are
+due faster than the frame rate, every step due in a frame runs in that frame
+and Tk redraws once. A new effect on a widget replaces the one still running
+on it, so effects never pile up.
+
+This module does not import tkinter; the scheduler only needs ``root.after``
+and widgets with ``config(bg=...)``.
+"""
+import time
+from collections import deque
+
+# Milliseconds between steps. "max" plays every pending step on the next
+# frame; "instant" runs steps as they are added and skips the effects
+SPEEDS = {"slow": 300, "normal": 60, "fast": 10, "max": 0, "instant": None}
+DEFAULT_SPEED = "normal"
+
+# Longest fade, in frames; a fade lasts about FADE_STEPS steps
+FADE_FRAMES = 8
+FADE_STEPS = 4
+
+
+def blend(start, end, fraction):
+    """Mix two "#rrggbb" colours, from start (0.0) to end (1.0)"""
+    start, end = int(start[1:], 16), int(end[1:], 16)
+    channels = []
+    for shift in (16, 8, 0):
+        a, b = (start >> shift) & 0xFF, (end >> shift) & 0xFF
+        channels.append(round(a + (b - a) * fraction))
+    return "#{:02x}{:02x}{:02x}".format(*channels)
+
+
+def resolve(color):
+    # Effects restore a colour given directly or read when the effect ends
+    return color() if callable(color) else color
+
+
+class AnimationScheduler:
+    def __init__(self, root, speed=DEFAULT_SPEED, fps=30):
+        self.root = root
+        self.interval = max(1, int(1000 / fps))
+        self.steps = deque()
+        # Running effects, one per widget: (iterator of colours, restore colour)
+        self.effects = {}
+        # Steps earned by the time elapsed since the last frame
+        self.credit = 0.0
+        self.last_tick = None
+        self.scheduled = False
+        self.set_speed(speed)
+
+    def set_speed(self, speed):
+        if speed not in SPEEDS:
+            raise ValueError(f"Unknown animation speed: {speed}")
+        self.speed = speed
+        self.step_ms = SPEEDS[speed]
+        if self.step_ms is None:
+            self.flush()
+            self.fade_frames = 0
+        else:
+            self.fade_frames = max(1, min(FADE_FRAMES, self.step_ms * FADE_STEPS // self.interval))
+
+    @property
+    def busy(self):
+        return bool(self.steps or self.effects)
+
+    def add(self, action, *args):
+        """Queue a step; action(*args) runs when the timeline reaches it"""
+        if self.step_ms is None:
+            action(*args)
+            return
+        self.steps.append((action, args))
+        self._wake()
+
+    def flash(self, widget, color, restore):
+        """Set widget's background to color and fade it back to restore.
+
+        restore is a colour or a callable returning one, read on every frame
+        so the fade ends on whatever the widget should show by then.
+        """
+        if self.step_ms is None:
+            return
+        frames = self.fade_frames
+
+        def colors():
+            for frame in range(1, frames):
+                yield blend(color, resolve(restore), frame / frames)
+
+        self._start(widget, color, colors(), restore)
+
+    def pulse(self, widget, color1, color2, restore, repeats=3):
+        """Alternate widget's background between two colours, then restore it"""
+        if self.step_ms is None:
+            return
+        hold = max(1, self.fade_frames // 2)
+        colors = ([color1] * hold + [color2] * hold) * repeats
+        self._start(widget, colors[0], iter(colors[1:]), restore)
+
+    def flush(self):
+        """Run every pending step and end every effect now"""
+        while self.steps:
+            action, args = self.steps.popleft()
+            action(*args)
+        for widget, (colors, restore) in list(self.effects.items()):
+            widget.config(bg=resolve(restore))
+        self.effects.clear()
+        self.credit = 0.0
+
+    def _start(self, widget, color, colors, restore):
+        widget.config(bg=color)
+        self.effects[widget] = (colors, restore)
+        self._wake()
+
+    def _wake(self):
+        if self.scheduled:
+            return
+        # Coming back from idle: the first step is due on the next frame
+        self.credit = 1.0
+        self.last_tick = time.monotonic()
+        self.scheduled = True
+        self.root.after(self.interval, self._tick)
+
+    def _tick(self):
+        now = time.monotonic()
+        elapsed_ms = (now - self.last_tick) * 1000
+        self.last_tick = now
+        try:
+            self._run_steps(elapsed_ms)
+            self._advance_effects()
+        finally:
+            if self.busy:
+                self.root.after(self.interval, self._tick)
+            else:
+                self.scheduled = False
+
+    def _run_steps(self, elapsed_ms):
+        steps = self.steps
+        if not steps:
+            return
+        if self.step_ms:
+            self.credit += elapsed_ms / self.step_ms
+            count = min(int(self.credit), len(steps))
+            self.credit -= count
+        else:
+            count = len(steps)
+        # Steps queued by these actions wait for a later frame
+        for _ in range(count):
+            action, args = steps.popleft()
+            action(*args)
+        if not steps:
+            self.credit = 0.0
+
+    def _advance_effects(self):
+        for widget, (colors, restore) in list(self.effects.items()):
+            color = next(colors, None)
+            if color is None:
+                del self.effects[widget]
+                color = resolve(restore)
+            widget.config(bg=color)
@@ -0,0 +1,220 @@
+"""Command-line batch solver.
+
+Reads one puzzle per line (81 characters, ``.`` or ``0`` for blanks) from a
+file or stdin and streams one solution per line to stdout. Lines that cannot
+be parsed are written as ``invalid`` and unsolvable puzzles as ``unsolvable``.
+Blank lines and lines starting with ``#`` are skipped. The input may also be
+a binary puzzle bank (see ``puzzle_store``). Throughput (overall and
+per worker process) is reported on stderr at the end.
+
+With ``--workers`` the input is streamed to a process pool in chunks; output
+keeps the input order unless ``--unordered`` is given, in which case every
+line is prefixed with its input index and a tab.
+
+    python batch_solve.py puzzles.txt > solutions.txt
+    cat puzzles.txt | python batch_solve.py --strategy mrv_degree
+    python batch_solve.py --workers 0 --chunk-size 500 puzzles.txt > solutions.txt
+
+``--cache FILE`` answers puzzles equivalent to ones solved before (in this run
+or, through the file, in earlier ones) from a solution cache; it needs a
+single worker:
+
+    python batch_solve.py --cache solutions.json puzzles.txt > solutions.txt
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from puzzle_store import PuzzleStore, is_store
+from solution_cache import SolutionCache
+from sudoku_api import BACKENDS, DEFAULT_BACKEND, format_grid, parse_puzzle, solve
+from sudoku_engine import DEFAULT_STRATEGY, STRATEGIES
+
+INVALID = "invalid"
+UNSOLVABLE = "unsolvable"
+
+
+def read_puzzles(stream):
+    """Yield puzzle lines from a stream, skipping blanks and comments"""
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+
+def solve_line(line, strategy=DEFAULT_STRATEGY, backend=DEFAULT_BACKEND, cache=None):
+    """Solve one puzzle line and return the output line"""
+    try:
+        board = parse_puzzle(line)
+    except ValueError:
+        return INVALID
+    solution = solve(board, strategy, backend, cache=cache)
+    return format_grid(solution) if solution else UNSOLVABLE
+
+
+def iter_chunks(lines, size):
+    """Group lines into lists of at most size lines without reading ahead"""
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def solve_chunk(first_index, lines, strategy, backend):
+    """Worker entry point; returns (first index, output lines, worker pid, busy seconds)"""
+    start = time.perf_counter()
+    results = [solve_line(line, strategy, backend) for line in lines]
+    return first_index, results, os.getpid(), time.perf_counter() - start
+
+
+def add_worker_stats(worker_stats, pid, count, busy):
+    """Add count results and busy seconds to a {pid: [results, busy seconds]} dict"""
+    stats = worker_stats.setdefault(pid, [0, 0.0])
+    stats[0] += count
+    stats[1] += busy
+
+
+def map_chunks(function, tasks, workers, ordered=True, worker_stats=None):
+    """Yield (key, results) of function(*task) for every task, on a process pool.
+
+    function must return (key, results, worker pid, busy seconds). At most a
+    few tasks per worker are in flight, so a lazy tasks iterable keeps memory
+    flat. Ordered results come in task order, otherwise as soon as a task is
+    done. worker_stats, if given, is filled with {pid: [results, busy seconds]}.
+    """
+    max_pending = workers * 4
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+
+        def collect(future):
+            key, results, pid, busy = future.result()
+            if worker_stats is not None:
+                add_worker_stats(worker_stats, pid, len(results), busy)
+            return key, results
+
+        def finished():
+            # Oldest task first when ordered, otherwise whichever is ready
+            if ordered:
+                return [pending.popleft()]
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.remove(future)
+            return done
+
+        for task in tasks:
+            pending.append(pool.submit(function, *task))
+            while len(pending) >= max_pending:
+                for future in finished():
+                    yield collect(future)
+
+        while pending:
+            for future in finished():
+                yield collect(future)
+
+
+def solve_stream(lines, strategy=DEFAULT_STRATEGY, workers=1, chunk_size=1000, ordered=True, worker_stats=None,
+                 backend=DEFAULT_BACKEND, cache=None):
+    """Yield (index, output line) for every puzzle line.
+
+    With more than one worker the lines are sent to a process pool in chunks
+    (see map_chunks), so memory stays flat however long the input is.
+    Unordered results are yielded as soon as a chunk is done. worker_stats, if
+    given, is filled with {pid: [puzzles, busy seconds]}. A solution cache is
+    only used by a single worker.
+    """
+    if workers <= 1:
+        start = time.perf_counter()
+        count = 0
+        for count, line in enumerate(lines, 1):
+            yield count - 1, solve_line(line, strategy, backend, cache)
+        if worker_stats is not None:
+            worker_stats[os.getpid()] = [count, time.perf_counter() - start]
+        return
+
+    def tasks():
+        first_index = 0
+        for chunk in iter_chunks(lines, chunk_size):
+            yield first_index, chunk, strategy, backend
+            first_index += len(chunk)
+
+    for first_index, results in map_chunks(solve_chunk, tasks(), workers, ordered, worker_stats):
+        yield from enumerate(results, first_index)
+
+
+def report_workers(worker_stats, stream=sys.stderr):
+    for pid, (puzzles, busy) in sorted((worker_stats or {}).items()):
+        worker_rate = puzzles / busy if busy > 0 else 0.0
+        print(f"  worker {pid}: {puzzles} puzzles, {busy:.3f} s busy ({worker_rate:.1f} puzzles/s)", file=stream)
+
+
+def report(count, solved, elapsed, worker_stats=None, stream=sys.stderr):
+    rate = count / elapsed if elapsed > 0 else 0.0
+    print(f"Solved {solved}/{count} puzzles in {elapsed:.3f} s ({rate:.1f} puzzles/s)", file=stream)
+    report_workers(worker_stats, stream)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve Sudoku puzzles without a GUI.")
+    parser.add_argument("input", nargs="?", default="-",
+                        help="puzzle file, one puzzle per line, or puzzle store ('-' for stdin)")
+    parser.add_argument("--strategy", choices=STRATEGIES, default=DEFAULT_STRATEGY,
+                        help="variable/value ordering used by the search")
+    parser.add_argument("--backend", choices=BACKENDS, default=DEFAULT_BACKEND,
+                        help="CSP engine, Dancing Links exact-cover or digit-by-digit solver")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of solver processes (0 = one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=1000,
+                        help="puzzles sent to a worker at a time")
+    parser.add_argument("--unordered", action="store_true",
+                        help="emit results as soon as they are ready, prefixed with the input index")
+    parser.add_argument("--cache", metavar="FILE",
+                        help="solution cache file, loaded at start and saved at the end (one worker only)")
+    args = parser.parse_args(argv)
+
+    workers = args.workers or os.cpu_count() or 1
+    if args.cache and workers > 1:
+        parser.error("--cache needs --workers 1")
+    cache = SolutionCache(path=args.cache) if args.cache else None
+    if args.input != "-" and is_store(args.input):
+        stream = PuzzleStore(args.input)
+        lines = (format_grid(puzzle) for puzzle, _, _ in stream.records())
+    else:
+        stream = sys.stdin if args.input == "-" else open(args.input)
+        lines = read_puzzles(stream)
+    worker_stats = {}
+    count = solved = 0
+    start = time.perf_counter()
+    try:
+        results = solve_stream(lines, args.strategy, workers, args.chunk_size,
+                               ordered=not args.unordered, worker_stats=worker_stats, backend=args.backend,
+                               cache=cache)
+        for index, result in results:
+            if args.unordered:
+                sys.stdout.write(f"{index}\t{result}\n")
+            else:
+                sys.stdout.write(result + "\n")
+            count += 1
+            if result not in (INVALID, UNSOLVABLE):
+                solved += 1
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    sys.stdout.flush()
+
+    report(count, solved, time.perf_counter() - start, worker_stats)
+    if cache is not None:
+        cache.save()
+        print("Cache: {hits} hits, {misses} misses, {evictions} evictions, {size} entries".format(**cache.stats()),
+              file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,290 @@
+"""Benchmark harness for the solvers, the generator and the domain computation.
+
+Every run uses the same seeded corpora (easy/medium/hard from SudokuGenerator
+plus a fixed set of adversarial puzzles), reports p50/p95/p99 latency and
+throughput per benchmark, and can store the results as JSON and compare them
+against a previous run:
+
+    python benchmark.py --output baseline.json
+    python benchmark.py --baseline baseline.json --threshold 0.2
+
+The comparison exits with status 1 if a benchmark's p50 latency regressed by
+more than the threshold (0.2 = 20%). ``--gui`` adds the domain view update
+benchmark, which needs a display.
+
+The "nearly_placed" corpus takes the hard puzzles and fills in all but one
+occurrence of a few digits, the case where the digit-by-digit solver (which
+finishes the digits with the fewest remaining placements first) is expected to
+beat cell-first search. "domain_tracker" times filling in a whole solution
+one edit at a time with incremental domains, to set against one full
+``generate_domain_array`` per edit. "solution_cache" times solves answered by
+a ``SolutionCache`` that already holds the puzzle (canonical form plus
+lookup). The "16x16" corpus (medium puzzles on 4x4 boxes) is only run through
+the engine, the one backend that handles larger boards.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+from board import Board, DomainTracker
+from helper import generate_domain_array
+from solution_cache import SolutionCache
+from sudoku_api import parse_puzzle, solve
+from sudoku_engine import STRATEGIES
+from sudoku_generator import DIFFICULTIES, SudokuGenerator
+
+# Known hard puzzles: 17-clue, anti-backtracking and "hardest" collections
+ADVERSARIAL = (
+    "..............3.85..1.2.......5.7.....4...1...9.......5......73..2.1........4...9",
+    "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..",
+    "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......",
+    ".......1.4.........2...........5.4.7..8...3....1.9....3..4..2...5.1........8.6...",
+    "1....7.9..3..2...8..96..5....53..9...1..8...26....4...3......1..4......7..7...3..",
+    "12.3....435....1....4........54..2..6...7.........8.9...31..5.......9.7.....6...8",
+    ".2.4.37.........32........4.4.2...7.8...5.........1...5.....9...3.9....7..1..86..",
+    "..53.....8......2..7..1.5..4....53...1..7...6..32...8..6.5....9..4....3......97..",
+)
+
+CORPORA = ("easy", "medium", "hard", "adversarial", "nearly_placed")
+
+# Boards with larger boxes, solved by the engine only
+LARGE_CORPORA = ("16x16",)
+
+# Digits placed everywhere but one cell in the "nearly_placed" corpus
+NEARLY_PLACED_DIGITS = 4
+
+
+def build_corpora(size=50, seed=2024):
+    """Return {name: [puzzle, ...]} generated from a fixed seed"""
+    corpora = {}
+    rng = random.Random(seed)
+    generator = SudokuGenerator(rng=rng)
+    for deff in DIFFICULTIES:
+        puzzles = corpora[deff.lower()] = []
+        for _ in range(size):
+            puzzles.append([row[:] for row in generator.generate_puzzle(deff)])
+            if deff == "Hard":
+                corpora.setdefault("nearly_placed", []).append(
+                    nearly_placed(puzzles[-1], generator.get_solution(), rng=rng))
+    corpora["adversarial"] = [parse_puzzle(line) for line in ADVERSARIAL]
+    # Larger boards take longer to generate, so the corpus is smaller
+    generator = SudokuGenerator(box_size=4, rng=random.Random(seed))
+    corpora["16x16"] = [[row[:] for row in generator.generate_puzzle("Medium")]
+                        for _ in range(max(1, size // 5))]
+    return corpora
+
+
+def nearly_placed(puzzle, solution, count=NEARLY_PLACED_DIGITS, rng=random):
+    """Copy of puzzle with every occurrence but one of count random digits filled in"""
+    board = [row[:] for row in puzzle]
+    for num in rng.sample(range(1, 10), count):
+        cells = [(row, col) for row in range(9) for col in range(9) if solution[row][col] == num]
+        cells.remove(rng.choice(cells))
+        for row, col in cells:
+            board[row][col] = num
+    return board
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a sorted list"""
+    index = max(0, min(len(samples) - 1, int(round(fraction * len(samples))) - 1))
+    return samples[index]
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    total = sum(samples)
+    return {
+        "count": len(samples),
+        "mean_ms": total / len(samples) * 1000,
+        "p50_ms": percentile(samples, 0.50) * 1000,
+        "p95_ms": percentile(samples, 0.95) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+        "throughput": len(samples) / total if total > 0 else 0.0,
+    }
+
+
+def time_each(function, items):
+    """Call function on a fresh copy of every board and return the durations"""
+    samples = []
+    for item in items:
+        board = [row[:] for row in item]
+        start = time.perf_counter()
+        function(board)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def engine_solve(strategy):
+    from sudoku_solver import SudokuSolver
+
+    return lambda board: SudokuSolver(board, strategy=strategy).solve()
+
+
+def dlx_solve(board):
+    from dlx_solver import DLXSolver
+
+    return DLXSolver(board).solve()
+
+
+def digit_solve(board):
+    from solver import SudokuSolver
+
+    return SudokuSolver(board).solve()
+
+
+def time_tracked_fills(boards):
+    """Time filling in each board's solution one cell at a time through a DomainTracker"""
+    samples = []
+    for board in boards:
+        solution = solve(board)
+        edits = [(row, col, solution[row][col]) for row in range(len(board))
+                 for col in range(len(board)) if not board[row][col]]
+        start = time.perf_counter()
+        tracker = DomainTracker(Board.from_grid(board))
+        for row, col, num in edits:
+            tracker.set(row, col, num)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def time_cache_hits(boards):
+    """Time solving each board through a SolutionCache that already holds it"""
+    cache = SolutionCache()
+    for board in boards:
+        solve(board, cache=cache)
+    return time_each(lambda board: solve(board, cache=cache), boards)
+
+
+def solver_benchmarks():
+    """Yield (name, function, corpora) for every solver benchmark"""
+    for strategy in STRATEGIES:
+        yield f"sudoku_solver.{strategy}", engine_solve(strategy), CORPORA + LARGE_CORPORA
+    yield "dlx", dlx_solve, CORPORA
+    yield "solver.digit", digit_solve, CORPORA
+
+
+def run_benchmarks(size=50, seed=2024, gui=False, names=None, log=sys.stderr):
+    corpora = build_corpora(size, seed)
+    results = {}
+
+    def selected(name):
+        return not names or any(name.startswith(prefix) for prefix in names)
+
+    def record(name, samples):
+        results[name] = summarize(samples)
+        print(f"{name:36} p50 {results[name]['p50_ms']:9.3f} ms  "
+              f"p95 {results[name]['p95_ms']:9.3f} ms  {results[name]['throughput']:10.1f}/s", file=log)
+
+    for name, function, corpus_names in solver_benchmarks():
+        for corpus in corpus_names:
+            if selected(f"{name}/{corpus}"):
+                record(f"{name}/{corpus}", time_each(function, corpora[corpus]))
+
+    for corpus in CORPORA:
+        name = f"solution_cache/{corpus}"
+        if selected(name):
+            record(name, time_cache_hits(corpora[corpus]))
+
+    for deff in DIFFICULTIES:
+        name = f"generator/{deff.lower()}"
+        if not selected(name):
+            continue
+        samples = []
+        generator = SudokuGenerator(rng=random.Random(seed))
+        for _ in range(size):
+            start = time.perf_counter()
+            generator.generate_puzzle(deff)
+            samples.append(time.perf_counter() - start)
+        record(name, samples)
+
+    for corpus in CORPORA + LARGE_CORPORA:
+        name = f"generate_domain_array/{corpus}"
+        if selected(name):
+            record(name, time_each(generate_domain_array, corpora[corpus]))
+
+    for corpus in CORPORA + LARGE_CORPORA:
+        name = f"domain_tracker/{corpus}"
+        if selected(name):
+            record(name, time_tracked_fills(corpora[corpus]))
+
+    if gui and selected("sudoku_domain"):
+        record_gui(corpora, record)
+
+    return results
+
+
+def record_gui(corpora, record):
+    # Time a full domain view refresh; needs a display
+    import tkinter as tk
+    from sudoku_domain import SudokuDomain
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as error:
+        print(f"Skipping GUI benchmark: {error}", file=sys.stderr)
+        return
+    boards = corpora["hard"]
+    view = SudokuDomain(root, generate_domain_array(boards[0]))
+
+    def refresh(board):
+        view.replace_all_cells(generate_domain_array(board))
+        root.update_idletasks()
+
+    record("sudoku_domain.replace_all_cells/hard", time_each(refresh, boards))
+    root.destroy()
+
+
+def compare(baseline, results, threshold=0.2):
+    """Return [(name, baseline p50, current p50)] for benchmarks slower by more than threshold"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous and current["p50_ms"] > previous["p50_ms"] * (1 + threshold):
+            regressions.append((name, previous["p50_ms"], current["p50_ms"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Sudoku solvers and generator.")
+    parser.add_argument("--size", type=int, default=50, help="puzzles per generated corpus")
+    parser.add_argument("--seed", type=int, default=2024, help="seed of the generated corpora")
+    parser.add_argument("--only", nargs="*", help="run only benchmarks whose name starts with one of these")
+    parser.add_argument("--gui", action="store_true", help="also benchmark domain view updates")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results of a previous run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed p50 slowdown against the baseline (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.size, args.seed, args.gui, args.only)
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "size": args.size,
+            "seed": args.seed,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = compare(baseline, results, args.threshold)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: p50 {before:.3f} ms -> {after:.3f} ms", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
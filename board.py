@@ -0,0 +1,230 @@
+"""Compact board representation.
+
+A ``Board`` keeps the digits of its cells in a ``bytearray`` (row-major, 0 for
+blanks) and the candidate mask of every cell in an ``array`` of unsigned
+integers (bit ``d - 1`` stands for digit ``d``, a filled cell holds its own
+bit). A 9x9 board takes a few hundred bytes instead of the tens of kilobytes of
+a list of lists plus the ``generate_domain_array`` dicts, ``copy`` and
+``restore`` are two buffer copies, and ``rows`` hands out memoryviews that
+index like the legacy list of rows without copying.
+
+Boards convert to and from the legacy formats: lists of rows
+(``from_grid``/``to_grid``), 81-character strings (``from_string``/``str``)
+and the domain view's cell data (``domain_array``). ``DomainTracker`` keeps
+the masks current through single-cell edits.
+"""
+from array import array
+
+from sudoku_index import geometry, geometry_of
+
+
+def mask_typecode(size):
+    # Unsigned short holds up to 16 digits, unsigned long at least 32
+    return "H" if size <= 16 else "L"
+
+
+class Board:
+    __slots__ = ("box_size", "size", "cells", "masks")
+
+    def __init__(self, box_size=3, cells=None, masks=None):
+        self.box_size = box_size
+        self.size = size = box_size * box_size
+        self.cells = bytearray(size * size) if cells is None else cells
+        if masks is None:
+            masks = array(mask_typecode(size), [0]) * (size * size)
+            self.masks = masks
+            self.update_masks()
+        else:
+            self.masks = masks
+
+    @classmethod
+    def from_grid(cls, grid):
+        """Build a board from a list of rows (0 for blanks)"""
+        box_size = geometry_of(grid).box_size
+        return cls(box_size, bytearray(num for row in grid for num in row))
+
+    @classmethod
+    def from_string(cls, line):
+        """Build a 9x9 board from an 81-character line using ``.`` or ``0`` for blanks"""
+        line = line.strip()
+        if len(line) != 81:
+            raise ValueError(f"Expected 81 characters, got {len(line)}")
+        if not all(char == "." or char.isdigit() for char in line):
+            raise ValueError(f"Invalid character in puzzle: {line!r}")
+        return cls(3, bytearray(0 if char == "." else int(char) for char in line))
+
+    def to_grid(self):
+        """Return the digits as a new list of rows"""
+        size, cells = self.size, self.cells
+        return [list(cells[start:start + size]) for start in range(0, size * size, size)]
+
+    def __str__(self):
+        return "".join(str(num) if num else "." for num in self.cells)
+
+    def __repr__(self):
+        return f"Board.from_string({str(self)!r})" if self.size == 9 else f"<Board {self.size}x{self.size}>"
+
+    def __eq__(self, other):
+        return isinstance(other, Board) and self.cells == other.cells
+
+    def __getitem__(self, position):
+        row, col = position
+        return self.cells[row * self.size + col]
+
+    def __setitem__(self, position, num):
+        # Only the digit changes; call update_masks() once a batch of edits is done
+        row, col = position
+        self.cells[row * self.size + col] = num
+
+    def rows(self, writable=False):
+        """Return one memoryview per row, indexed like the legacy list of rows.
+
+        The views share the board's memory. They are read-only unless writable
+        is set, in which case writes go straight into the board (the masks are
+        not updated).
+        """
+        view = memoryview(self.cells)
+        if not writable:
+            view = view.toreadonly()
+        size = self.size
+        return [view[start:start + size] for start in range(0, size * size, size)]
+
+    def copy(self):
+        return Board(self.box_size, bytearray(self.cells), self.masks[:])
+
+    def restore(self, snapshot):
+        """Overwrite this board in place with a copy taken earlier"""
+        self.cells[:] = snapshot.cells
+        self.masks[:] = snapshot.masks
+
+    def update_masks(self):
+        """Recompute every candidate mask from the digits"""
+        tables = geometry(self.box_size)
+        size, cells, masks = self.size, self.cells, self.masks
+        rows, cols, boxes = [0] * size, [0] * size, [0] * size
+        row_of, col_of, box_of = tables.row_of, tables.col_of, tables.box_of
+        for index, num in enumerate(cells):
+            if num:
+                bit = 1 << (num - 1)
+                rows[row_of[index]] |= bit
+                cols[col_of[index]] |= bit
+                boxes[box_of[index]] |= bit
+        all_candidates = tables.all_candidates
+        for index, num in enumerate(cells):
+            if num:
+                masks[index] = 1 << (num - 1)
+            else:
+                masks[index] = all_candidates & ~(rows[row_of[index]] | cols[col_of[index]] | boxes[box_of[index]])
+
+    def candidates(self, row, col):
+        """Return the candidate digits of a cell in increasing order"""
+        mask = self.masks[row * self.size + col]
+        return [num for num in range(1, self.size + 1) if mask & (1 << (num - 1))]
+
+    def cell_data(self, index):
+        """Return one cell in the domain view's format (see helper.generate_domain_array)"""
+        num = self.cells[index]
+        if num:
+            return {"value": [num], "color": "gray", "domain": []}
+        mask = self.masks[index]
+        domain = [digit for digit in range(1, self.size + 1) if mask >> (digit - 1) & 1]
+        return {"value": [0], "color": "white", "domain": domain}
+
+    def domain_array(self):
+        """Return the cell data of the domain view (see helper.generate_domain_array)"""
+        size = self.size
+        return [[self.cell_data(index) for index in range(start, start + size)]
+                for start in range(0, size * size, size)]
+
+
+class DomainTracker:
+    """Keeps a Board's candidate masks up to date one cell edit at a time.
+
+    Instead of re-deriving every domain after an edit, assign and clear only
+    touch the cell and its peers and return the indexes of the cells whose
+    digit or mask changed, so views can redraw just those.
+    """
+
+    def __init__(self, board):
+        self.board = board
+        self.tables = tables = geometry(board.box_size)
+        size = board.size
+        # Digits used in every row, column and box
+        self.rows, self.cols, self.boxes = [0] * size, [0] * size, [0] * size
+        for index, num in enumerate(board.cells):
+            if num:
+                self._mark(index, 1 << (num - 1))
+        board.update_masks()
+
+    def _mark(self, index, bit):
+        tables = self.tables
+        self.rows[tables.row_of[index]] |= bit
+        self.cols[tables.col_of[index]] |= bit
+        self.boxes[tables.box_of[index]] |= bit
+
+    def assign(self, row, col, num):
+        """Place num in an empty cell; return the changed cell indexes"""
+        board = self.board
+        index = row * board.size + col
+        bit = 1 << (num - 1)
+        cells, masks = board.cells, board.masks
+        cells[index] = num
+        masks[index] = bit
+        self._mark(index, bit)
+        changed = [index]
+        for peer in self.tables.peers[index]:
+            if not cells[peer] and masks[peer] & bit:
+                masks[peer] &= ~bit
+                changed.append(peer)
+        return changed
+
+    def clear(self, row, col):
+        """Empty a cell; return the changed cell indexes"""
+        board, tables = self.board, self.tables
+        index = row * board.size + col
+        cells, masks = board.cells, board.masks
+        if not cells[index]:
+            return []
+        cells[index] = 0
+        # Rescan the cell's three units, so a digit still placed elsewhere in
+        # them (e.g. a duplicate entry) stays used
+        row_unit, col_unit, box_unit = tables.units_of[index]
+        for unit, used_of, slot in ((row_unit, self.rows, row), (col_unit, self.cols, col),
+                                    (box_unit, self.boxes, tables.box_of[index])):
+            used = 0
+            for cell in tables.units[unit]:
+                if cells[cell]:
+                    used |= 1 << (cells[cell] - 1)
+            used_of[slot] = used
+
+        changed = []
+        for cell in (index,) + tables.peers[index]:
+            if not cells[cell]:
+                mask = self.candidates(cell)
+                if mask != masks[cell]:
+                    masks[cell] = mask
+                    changed.append(cell)
+        if index not in changed:
+            changed.insert(0, index)
+        return changed
+
+    def candidates(self, index):
+        tables = self.tables
+        return tables.all_candidates & ~(self.rows[tables.row_of[index]] |
+                                         self.cols[tables.col_of[index]] |
+                                         self.boxes[tables.box_of[index]])
+
+    def set(self, row, col, num):
+        """Put num (0 to clear) in a cell, replacing any digit; return the changed cell indexes"""
+        index = row * self.board.size + col
+        if self.board.cells[index] == num:
+            return []
+        changed = self.clear(row, col)
+        if num:
+            changed.extend(cell for cell in self.assign(row, col, num) if cell not in changed)
+        return changed
+
+    def changes(self, indexes):
+        """Return (row, col, cell data) for cells, ready for SudokuDomain.apply_changes"""
+        size, board = self.board.size, self.board
+        return [(index // size, index % size, board.cell_data(index)) for index in indexes]
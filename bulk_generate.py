@@ -0,0 +1,129 @@
+"""Command-line bulk puzzle generator.
+
+Generates puzzles on a process pool and streams them to a file, stdout or a
+binary puzzle bank (see ``puzzle_store``). Text output has one 81-character
+puzzle per line (``.`` for blanks), followed by a space and the solution with
+``--solutions``.
+
+Generation is reproducible: puzzle ``i`` belongs to chunk ``i // chunk_size``,
+and every chunk draws from its own ``random.Random`` seeded from the master
+seed and the chunk index. Results are written in chunk order, so the same
+seed, count, difficulties and chunk size give byte-identical output whatever
+the number of workers:
+
+    python bulk_generate.py --seed 42 --count 10000 --workers 0 > puzzles.txt
+    python bulk_generate.py --seed 42 --count 10000 --difficulty Easy Hard --store bank.bin
+
+With several difficulties they are dealt out in turn, puzzle ``i`` getting
+difficulty ``i % len(difficulties)``. The command line writes 9x9 puzzles;
+``generate_stream`` also takes other box sizes.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+from batch_solve import add_worker_stats, map_chunks, report_workers
+from puzzle_store import PuzzleStoreWriter
+from sudoku_api import format_grid
+from sudoku_generator import DIFFICULTIES, SudokuGenerator
+
+
+def chunk_rng(seed, chunk):
+    """Return the random stream of a chunk.
+
+    A string seed is hashed with SHA-512, so the stream does not depend on the
+    interpreter's hash randomization or on which process runs the chunk.
+    """
+    return random.Random(f"{seed}/{chunk}")
+
+
+def generate_chunk(seed, chunk, first_index, count, difficulties, box_size=3):
+    """Worker entry point; returns (chunk, [(puzzle, solution, difficulty)], worker pid, busy seconds)"""
+    start = time.perf_counter()
+    generator = SudokuGenerator(box_size, rng=chunk_rng(seed, chunk))
+    results = []
+    for index in range(first_index, first_index + count):
+        deff = difficulties[index % len(difficulties)]
+        puzzle = generator.generate_puzzle(deff)
+        results.append(([row[:] for row in puzzle], generator.get_solution(), deff))
+    return chunk, results, os.getpid(), time.perf_counter() - start
+
+
+def generate_stream(seed, count, difficulties=("Hard",), workers=1, chunk_size=100, box_size=3, worker_stats=None):
+    """Yield (puzzle, solution, difficulty) for count puzzles, in a reproducible order.
+
+    With more than one worker the chunks go to a process pool (see
+    batch_solve.map_chunks) and are collected oldest first. worker_stats, if
+    given, is filled with {pid: [puzzles, busy seconds]}.
+    """
+    tasks = ((seed, chunk, first, min(chunk_size, count - first), difficulties, box_size)
+             for chunk, first in enumerate(range(0, count, chunk_size)))
+    if workers <= 1:
+        for task in tasks:
+            _, results, pid, busy = generate_chunk(*task)
+            if worker_stats is not None:
+                add_worker_stats(worker_stats, pid, len(results), busy)
+            yield from results
+        return
+
+    for _, results in map_chunks(generate_chunk, tasks, workers, worker_stats=worker_stats):
+        yield from results
+
+
+def report(count, elapsed, worker_stats=None, stream=sys.stderr):
+    rate = count / elapsed if elapsed > 0 else 0.0
+    print(f"Generated {count} puzzles in {elapsed:.3f} s ({rate:.1f} puzzles/s)", file=stream)
+    report_workers(worker_stats, stream)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate Sudoku puzzles in bulk, reproducibly from a seed.")
+    parser.add_argument("--seed", type=int, required=True, help="master seed")
+    parser.add_argument("--count", type=int, default=1000, help="number of puzzles")
+    parser.add_argument("--difficulty", nargs="+", choices=DIFFICULTIES, default=["Hard"],
+                        help="difficulties, dealt out in turn")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of generator processes (0 = one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=100,
+                        help="puzzles per chunk; part of what the output depends on")
+    parser.add_argument("--solutions", action="store_true", help="also write the solutions")
+    parser.add_argument("--output", default="-", help="text file to write ('-' for stdout)")
+    parser.add_argument("--store", metavar="FILE", help="write a puzzle store instead of text")
+    args = parser.parse_args(argv)
+
+    if args.count < 0 or args.chunk_size < 1:
+        parser.error("--count must not be negative and --chunk-size must be positive")
+    workers = args.workers or os.cpu_count() or 1
+    worker_stats = {}
+    results = generate_stream(args.seed, args.count, tuple(args.difficulty), workers, args.chunk_size,
+                              worker_stats=worker_stats)
+    start = time.perf_counter()
+    count = 0
+    if args.store:
+        with PuzzleStoreWriter(args.store, args.solutions) as writer:
+            for puzzle, solution, deff in results:
+                writer.add(puzzle, deff, solution)
+                count += 1
+    else:
+        out = sys.stdout if args.output == "-" else open(args.output, "w", newline="\n")
+        try:
+            for puzzle, solution, _ in results:
+                line = format_grid(puzzle)
+                if args.solutions:
+                    line += " " + format_grid(solution)
+                out.write(line + "\n")
+                count += 1
+        finally:
+            if out is sys.stdout:
+                out.flush()
+            else:
+                out.close()
+
+    report(count, time.perf_counter() - start, worker_stats)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""Canonical forms of 9x9 puzzles.
+
+Relabeling the digits, permuting the bands, the rows inside a band, the
+stacks and the columns inside a stack, and transposing all turn a puzzle into
+an equivalent one whose solution is the transformed solution.
+``canonical_form(grid)`` returns a representative of the puzzle's class, as an
+81-character key, together with the ``Transform`` that maps the puzzle onto
+it; ``transform.invert(solution)`` maps a solution of the representative back.
+
+Trying all 3,359,232 position changes would cost far more than a solve, so
+bands, rows, stacks and columns are first sorted by invariants (how the givens
+are spread over them) and only orders of units the invariants cannot tell
+apart are tried; the smallest relabeled grid wins. On very symmetric puzzles
+more than ``MAX_CANDIDATES`` orders tie and only the first ones are tried, so
+an equivalent puzzle may end up with another representative. That costs a
+cache hit, never a wrong answer: a representative is always an actual
+transform of its puzzle.
+"""
+from itertools import chain, groupby, islice, permutations, product
+
+# Orders tried per orientation before settling for the best one so far
+MAX_CANDIDATES = 2000
+
+
+def transpose(grid):
+    return [list(col) for col in zip(*grid)]
+
+
+class Transform:
+    __slots__ = ("transposed", "rows", "cols", "labels")
+
+    def __init__(self, transposed, rows, cols, labels):
+        # Row i of the image is row rows[i] of the (transposed) grid, column j
+        # is column cols[j], and digit d becomes labels[d] (labels[0] == 0)
+        self.transposed = transposed
+        self.rows = rows
+        self.cols = cols
+        self.labels = labels
+
+    def apply(self, grid):
+        """Return the image of a puzzle or solution, as a new list of rows"""
+        source = transpose(grid) if self.transposed else grid
+        labels = self.labels
+        return [[labels[source[row][col]] for col in self.cols] for row in self.rows]
+
+    def invert(self, grid):
+        """Map the image of a puzzle or solution back, as a new list of rows"""
+        inverse = [0] * 10
+        for digit, label in enumerate(self.labels):
+            inverse[label] = digit
+        result = [[0] * 9 for _ in range(9)]
+        for image_row, row in zip(grid, self.rows):
+            for label, col in zip(image_row, self.cols):
+                result[row][col] = inverse[label]
+        return transpose(result) if self.transposed else result
+
+
+def canonical_form(grid):
+    """Return (key, transform) for a 9x9 puzzle given as a list of rows.
+
+    key is the representative as an 81-character line (``.`` for blanks);
+    equivalent puzzles share it except on the very symmetric puzzles described
+    in the module docstring.
+    """
+    if len(grid) != 9 or any(len(row) != 9 for row in grid):
+        raise ValueError("Canonical forms are only defined for 9x9 boards")
+    best = best_transform = None
+    for transposed in (False, True):
+        source = transpose(grid) if transposed else [list(row) for row in grid]
+        col_orders = list(islice(unit_orders(transpose(source)), MAX_CANDIDATES))
+        for rows, cols in islice(product(unit_orders(source), col_orders), MAX_CANDIDATES):
+            cells, labels = relabel(source, rows, cols, best)
+            if cells is not None:
+                best = cells
+                best_transform = Transform(transposed, rows, cols, labels)
+    return "".join(str(num) if num else "." for num in best), best_transform
+
+
+def unit_orders(grid):
+    """Yield the row orders sorted by invariants, trying every order of tied bands and rows"""
+    col_counts = [sum(1 for row in grid if row[col]) for col in range(9)]
+    # A row is described by the givens in each stack, each given by the
+    # number of givens in its column; neither changes under the symmetries
+    row_keys = [
+        tuple(sorted(tuple(sorted(col_counts[col] for col in range(stack * 3, stack * 3 + 3) if grid[row][col]))
+                     for stack in range(3)))
+        for row in range(9)
+    ]
+    band_keys = [tuple(sorted(row_keys[band * 3:band * 3 + 3])) for band in range(3)]
+    rows_in_band = [tied_orders(range(band * 3, band * 3 + 3), row_keys.__getitem__) for band in range(3)]
+    for bands in tied_orders(range(3), band_keys.__getitem__):
+        for rows in product(*(rows_in_band[band] for band in bands)):
+            yield list(chain.from_iterable(rows))
+
+
+def tied_orders(units, key):
+    """Return every order of units sorted by key, permuting units with equal keys"""
+    units = sorted(units, key=key)
+    groups = [list(group) for _, group in groupby(units, key=key)]
+    return [list(chain.from_iterable(choice)) for choice in product(*map(permutations, groups))]
+
+
+def relabel(source, rows, cols, best):
+    """Return (cells, labels) of the image if it is smaller than best, else (None, None).
+
+    Digits are relabeled in order of first appearance; blanks (0) sort first.
+    """
+    labels = [0] * 10
+    next_label = 1
+    cells = []
+    smaller = best is None
+    for row in rows:
+        source_row = source[row]
+        for col in cols:
+            digit = source_row[col]
+            if digit and not labels[digit]:
+                labels[digit] = next_label
+                next_label += 1
+            label = labels[digit]
+            if not smaller:
+                other = best[len(cells)]
+                if label > other:
+                    return None, None
+                smaller = label < other
+            cells.append(label)
+    if not smaller:
+        return None, None
+    # Digits missing from the puzzle take the remaining labels in order
+    for digit in range(1, 10):
+        if not labels[digit]:
+            labels[digit] = next_label
+            next_label += 1
+    return cells, labels
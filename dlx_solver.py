@@ -0,0 +1,179 @@
+"""Dancing Links (Algorithm X) exact-cover backend.
+
+Sudoku is an exact cover problem over 324 constraint columns (cell filled,
+row/digit, column/digit, box/digit) and 729 candidate rows (cell, digit). Only
+the rows that agree with the givens are built, and columns already satisfied
+by the givens are left out of the header ring.
+
+The toroidal linked list lives in flat integer lists (``left``, ``right``,
+``up``, ``down``, ``column``, ``row_id``) indexed by node number instead of
+per-node objects, so building the matrix is a few thousand appends.
+"""
+from sudoku_index import BOX_OF, COL_OF, ROW_OF
+
+COLUMNS = 324
+
+
+def row_columns(index, num):
+    """Return the four constraint columns (1-based) covered by num at a cell"""
+    digit = num - 1
+    return (
+        1 + index,
+        82 + ROW_OF[index] * 9 + digit,
+        163 + COL_OF[index] * 9 + digit,
+        244 + BOX_OF[index] * 9 + digit,
+    )
+
+
+class DLXSolver:
+    def __init__(self, board):
+        self.board = board
+        # Candidate rows of the partial cover, as cell * 9 + digit - 1
+        self.rows_chosen = []
+        self.solutions_found = 0
+        # The first solution found, as a list of rows
+        self.solution = None
+        self.consistent = True
+        self._build()
+
+    def _build(self):
+        board = self.board
+        satisfied = [False] * (COLUMNS + 1)
+        for index in range(81):
+            num = board[ROW_OF[index]][COL_OF[index]]
+            if num:
+                for col in row_columns(index, num):
+                    if satisfied[col]:
+                        # Two givens claim the same constraint
+                        self.consistent = False
+                    satisfied[col] = True
+
+        # Node 0 is the root, nodes 1..324 are the column headers
+        left = list(range(-1, COLUMNS))
+        right = list(range(1, COLUMNS + 2))
+        up = list(range(COLUMNS + 1))
+        down = list(range(COLUMNS + 1))
+        column = list(range(COLUMNS + 1))
+        row_id = [-1] * (COLUMNS + 1)
+        size = [0] * (COLUMNS + 1)
+
+        # Header ring of the unsatisfied columns only
+        previous = 0
+        for col in range(1, COLUMNS + 1):
+            if not satisfied[col]:
+                right[previous] = col
+                left[col] = previous
+                previous = col
+        right[previous] = 0
+        left[0] = previous
+
+        for index in range(81):
+            if board[ROW_OF[index]][COL_OF[index]]:
+                continue
+            for num in range(1, 10):
+                cols = row_columns(index, num)
+                if any(satisfied[col] for col in cols):
+                    continue
+                first = len(left)
+                for offset, col in enumerate(cols):
+                    node = first + offset
+                    # Horizontal ring of the four nodes of this row
+                    left.append(first + (offset - 1) % 4)
+                    right.append(first + (offset + 1) % 4)
+                    # Append at the bottom of the column
+                    up.append(up[col])
+                    down.append(col)
+                    down[up[col]] = node
+                    up[col] = node
+                    column.append(col)
+                    row_id.append(index * 9 + num - 1)
+                    size[col] += 1
+
+        self.left, self.right, self.up, self.down = left, right, up, down
+        self.column, self.row_id, self.size = column, row_id, size
+
+    def cover(self, col):
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        right[left[col]] = right[col]
+        left[right[col]] = left[col]
+        i = down[col]
+        while i != col:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def uncover(self, col):
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        i = up[col]
+        while i != col:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[col]] = col
+        left[right[col]] = col
+
+    def _search(self, limit):
+        right, size = self.right, self.size
+        if right[0] == 0:
+            self.solutions_found += 1
+            if self.solutions_found == 1:
+                self._write_solution()
+            return self.solutions_found >= limit
+
+        # Choose the column with the fewest rows (S heuristic)
+        col = right[0]
+        best = col
+        while col != 0:
+            if size[col] < size[best]:
+                best = col
+                if size[col] <= 1:
+                    break
+            col = right[col]
+        if size[best] == 0:
+            return False
+
+        self.cover(best)
+        done = False
+        node = self.down[best]
+        while node != best and not done:
+            self.rows_chosen.append(self.row_id[node])
+            j = right[node]
+            while j != node:
+                self.cover(self.column[j])
+                j = right[j]
+
+            done = self._search(limit)
+
+            j = self.left[node]
+            while j != node:
+                self.uncover(self.column[j])
+                j = self.left[j]
+            self.rows_chosen.pop()
+            node = self.down[node]
+        self.uncover(best)
+        return done
+
+    def _write_solution(self):
+        for rid in self.rows_chosen:
+            index, digit = divmod(rid, 9)
+            self.board[ROW_OF[index]][COL_OF[index]] = digit + 1
+        self.solution = [list(row) for row in self.board]
+
+    def count_solutions(self, limit=2):
+        """Count solutions, stopping once limit is reached (None counts all); the first one is written to the board"""
+        self.solutions_found = 0
+        self.solution = None
+        if self.consistent:
+            self._search(limit or float("inf"))
+        return self.solutions_found
+
+    def solve(self):
+        return self.count_solutions(limit=1) == 1
@@ -0,0 +1,99 @@
+"""Domain-change events passed from the solver thread to the domain view.
+
+The solver only pushes ``(row, col, num)`` tuples into a bounded queue
+(``num == 0`` means the cell was cleared on backtrack). A consumer running on
+the Tk main loop drains the queue from ``root.after`` callbacks, feeds the
+events to a ``board.DomainTracker`` and redraws only the cells whose domains
+changed, at most once per frame, so a fast solve is not slowed down by
+rendering and no Tk call is made off the main thread.
+
+This module does not import tkinter; the consumer only needs ``root.after``.
+"""
+from queue import Empty, Full, Queue
+
+from board import Board, DomainTracker
+
+
+class DomainEventQueue:
+    def __init__(self, maxsize=10000):
+        self.queue = Queue(maxsize)
+        # Set when events had to be dropped; the consumer then resyncs
+        self.overflowed = False
+        self.finished = False
+        self.result = None
+        # Latest search statistics snapshot (a dict), replaced on every update
+        self.stats = None
+
+    def emit(self, row, col, num):
+        """Solver callback; never blocks, drops the event if the queue is full"""
+        try:
+            self.queue.put_nowait((row, col, num))
+        except Full:
+            self.overflowed = True
+
+    def update_stats(self, stats):
+        """SearchStats callback; only the most recent snapshot is kept"""
+        self.stats = stats
+
+    def finish(self, result):
+        """Mark the solve as done; result is the solved board or None"""
+        self.result = result
+        self.finished = True
+
+    def drain(self):
+        """Return all pending events"""
+        events = []
+        try:
+            while True:
+                events.append(self.queue.get_nowait())
+        except Empty:
+            pass
+        return events
+
+
+class DomainEventConsumer:
+    def __init__(self, root, sudoku_domain, board, events, fps=30, on_finish=None):
+        self.root = root
+        self.sudoku_domain = sudoku_domain
+        # The live solver board, only read to resync after an overflow
+        self.board = board
+        # Mirror of the board as seen through the events, with its domains
+        self.tracker = DomainTracker(Board.from_grid(board))
+        self.events = events
+        self.interval = max(1, int(1000 / fps))
+        self.on_finish = on_finish
+        self.shown_stats = None
+
+    def start(self):
+        self.root.after(self.interval, self.poll)
+
+    def poll(self):
+        # Read the flag before draining so no event emitted before finish is missed
+        finished = self.events.finished
+        changed = self.apply(self.events.drain())
+        # Resync after dropped events, and at the end for backends that do not emit any
+        if self.events.overflowed or (finished and self.tracker.board != Board.from_grid(self.board)):
+            self.events.overflowed = False
+            self.tracker = DomainTracker(Board.from_grid(self.board))
+            self.sudoku_domain.replace_all_cells(self.tracker.board.domain_array())
+        elif changed:
+            # Coalesce everything received since the last frame into one redraw
+            # of the cells whose domains changed
+            self.sudoku_domain.apply_changes(self.tracker.changes(sorted(changed)))
+        stats = self.events.stats
+        if stats is not None and stats is not self.shown_stats:
+            self.shown_stats = stats
+            self.sudoku_domain.show_search_stats(stats)
+
+        if finished:
+            if self.on_finish:
+                self.on_finish(self.events.result)
+        else:
+            self.root.after(self.interval, self.poll)
+
+    def apply(self, events):
+        """Feed events to the tracker; return the indexes of the changed cells"""
+        changed = set()
+        for row, col, num in events:
+            changed.update(self.tracker.set(row, col, num))
+        return changed
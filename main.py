@@ -1,23 +1,36 @@
+import os
 import tkinter as tk
-import copy
-import time
-
-from helper import generate_domain_array
-from sudoku_solver import run
+from tkinter import messagebox
+
+from animation import AnimationScheduler, DEFAULT_SPEED, SPEEDS
+from board import Board
+from domain_events import DomainEventConsumer, DomainEventQueue
+from puzzle_store import PuzzleStore, is_store
+from solve_job import FAILED, SOLVED, SolveJob, TIMED_OUT, UNSOLVABLE
+from sudoku_solver import show_outcome
 from sudoku_board import SudokuGameGui
 from sudoku_generator import SudokuGenerator
 from sudoku_domain import SudokuDomain
 
+# Seconds before a solve job gives up on a puzzle
+SOLVE_TIMEOUT = 60
+
+# Random mode draws from this puzzle bank when it exists (see puzzle_store.py)
+# and generates a puzzle otherwise
+PUZZLE_BANK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "puzzles.bin")
+
 
 # Helpers
 def get_puzzle_mode():
     mode = selected_mode.get()
     deff = selected_difficulty.get()
     if mode == "Random":
-        # Generate a random sudoku
-        generator = SudokuGenerator()
-        puzzle = generator.generate_puzzle(deff)
-        print("Generated Sudoku:",generator.get_solution())
+        puzzle = bank_puzzle(deff)
+        if puzzle is None:
+            # Generate a random sudoku
+            generator = SudokuGenerator()
+            puzzle = generator.generate_puzzle(deff)
+            print("Generated Sudoku:",generator.get_solution())
     elif mode == "Input":
         # Construct the puzzle from the values entered in the main window
         puzzle = []
@@ -36,6 +49,16 @@ def get_puzzle_mode():
     return puzzle
 
 
+def bank_puzzle(deff):
+    # A random puzzle of the difficulty from the puzzle bank, or None
+    if not is_store(PUZZLE_BANK):
+        return None
+    with PuzzleStore(PUZZLE_BANK) as store:
+        if not store.count_of(deff):
+            return None
+        return store.random(deff)
+
+
 def get_selected_difficulty():
     return selected_difficulty.get()
 
@@ -48,12 +71,49 @@ def move_cursor(event, row, col):
         entries[row][col].focus_set()
 
 
+# Solve jobs
+def empty_solution():
+    # Filled in once the solve job finishes
+    return [[0] * 9 for _ in range(9)]
+
+
+def add_job_controls(window, job):
+    """Show a solve job's progress under the board, with a button to cancel it"""
+    frame = tk.Frame(window)
+    frame.grid(row=9, column=0, columnspan=9, pady=5)
+    status = tk.Label(frame, text="Solving...", font=('Arial', 11))
+    status.pack(side=tk.LEFT, padx=5)
+    cancel_button = tk.Button(frame, text="Cancel", font=('Arial', 11), command=job.cancel)
+    cancel_button.pack(side=tk.LEFT, padx=5)
+
+    def refresh():
+        if job.done:
+            cancel_button.config(state='disabled')
+            status.config(text=f"{job.state.capitalize()} after {job.elapsed():.1f} s")
+            return
+        nodes = job.progress["nodes"] if job.progress else 0
+        status.config(text=f"Solving... {job.elapsed():.1f} s, {nodes} nodes")
+        window.after(200, refresh)
+
+    refresh()
+
+
+def report_job(job):
+    """Tell the user why a job ended without a solution"""
+    if job.state == UNSOLVABLE:
+        show_outcome(None)
+    elif job.state == TIMED_OUT:
+        messagebox.showinfo("Timed out", f"No solution found within {SOLVE_TIMEOUT} seconds.")
+    elif job.state == FAILED:
+        messagebox.showerror("Error", f"The solver failed: {job.error}")
+
+
 # Buttons
 def user_button_click():
-    sol = get_puzzle_mode()
-    sudoku_board = copy.deepcopy(sol)
+    puzzle = get_puzzle_mode()
+    speed = selected_speed.get()
+    sudoku_board = Board.from_grid(puzzle)  # Snapshot of the givens
     root.destroy()  # Close the main window
-    run(sol)
 
     # Create a new Tkinter window for SudokuGameGui
     new_root_game = tk.Tk()
@@ -64,10 +124,23 @@ def user_button_click():
     new_root_domain.title("Sudoku Domains")
 
     # Initialize the SudokuDomain object
-    cell_data = generate_domain_array(sudoku_board)
-    sudoku_domain = SudokuDomain(new_root_domain, cell_data)
-    # Create the SudokuGameGui object with the SudokuDomain
-    app = SudokuGameGui(new_root_game, sudoku_board, sol, sudoku_domain)
+    cell_data = sudoku_board.domain_array()
+    sudoku_domain = SudokuDomain(new_root_domain, cell_data, speed)
+    # Create the SudokuGameGui object with the SudokuDomain; the board is
+    # playable right away while the solution is found in the background
+    sol = empty_solution()
+    app = SudokuGameGui(new_root_game, sudoku_board.rows(), sol, sudoku_domain)
+
+    def show_result(job):
+        if job.state == SOLVED:
+            for row, solved in zip(sol, job.result):
+                row[:] = solved
+            app.recheck()
+        else:
+            report_job(job)
+
+    job = SolveJob(puzzle, timeout=SOLVE_TIMEOUT).start(new_root_game, show_result)
+    add_job_controls(new_root_game, job)
 
     # Calculate the screen width and height
     screen_width = new_root_game.winfo_screenwidth()
@@ -95,31 +168,42 @@ def user_button_click():
 
 def AI_button_click():
     puzzle = get_puzzle_mode()
-    sudoku_board = copy.deepcopy(puzzle)
+    speed = selected_speed.get()
+    sudoku_board = Board.from_grid(puzzle)  # Snapshot of the givens
     root.destroy()  # Close the main window
-    run(puzzle)
 
     new_root = tk.Tk()
     new_root.title("Sudoku Game")
-    app = SudokuGameGui(new_root, sudoku_board, puzzle, edit_block=True)
-
-    # Define a recursive function to fill the cells with a delay
-    def fill_cells(row, col):
-        if row == 9:
-            return  # Exit when all rows are filled
-        if col == 9:
-            fill_cells(row + 1, 0)  # Move to the next row
-            return
-        if sudoku_board[row][col] == 0:
-            num = puzzle[row][col]
-            # new_root.after(1000, app.write_number, row, col, num)  # Call write_number after 1 second
-            time.sleep(0.3)
-            app.write_number(row, col, num)
-            new_root.update()  # Update the GUI to reflect changes
-        fill_cells(row, col + 1)  # Move to the next column
+    sol = empty_solution()
+    app = SudokuGameGui(new_root, sudoku_board.rows(), sol, edit_block=True)
 
-    if puzzle:
-        fill_cells(0, 0)  # Start filling cells from the first cell
+    # Show the search live in a domain window while the job runs
+    new_root_domain = tk.Toplevel()
+    new_root_domain.title("Sudoku Solver")
+    sudoku_domain = SudokuDomain(new_root_domain, sudoku_board.domain_array(), speed)
+    events = DomainEventQueue()
+    job = SolveJob(puzzle, timeout=SOLVE_TIMEOUT, events=events)
+    DomainEventConsumer(new_root_domain, sudoku_domain, job.board, events).start()
+
+    # Fill the solved cells one at a time, played back from the event loop
+    animator = AnimationScheduler(new_root, speed)
+
+    def fill_cells():
+        for row in range(9):
+            for col in range(9):
+                if sudoku_board[row, col] == 0:
+                    animator.add(app.write_number, row, col, sol[row][col])
+
+    def show_result(job):
+        if job.state == SOLVED:
+            for row, solved in zip(sol, job.result):
+                row[:] = solved
+            fill_cells()
+        else:
+            report_job(job)
+
+    job.start(new_root, show_result)
+    add_job_controls(new_root, job)
 
     new_root.mainloop()
 
@@ -178,70 +262,78 @@ def validate_row_col(event):
     return True
 
 
-# Create the main window
-root = tk.Tk()
-root.title("Sudoku Game")
+if __name__ == "__main__":
+    # Create the main window
+    root = tk.Tk()
+    root.title("Sudoku Game")
+
+    # Define the 9x9 grid layout
+    grid_frame = tk.Frame(root)
+    grid_frame.grid(row=0, column=0)
+
+    # Create a 9x9 grid of Entry widgets to represent the Sudoku puzzle
+    entries = []
+    for i in range(9):
+        row = []
+        for j in range(9):
+            entry = tk.Entry(grid_frame, width=2, font=('Arial', 18), justify='center')
+            entry.grid(row=i, column=j, padx=1, pady=1)
+            # Add constraints to only allow single digits from 1 to 9
+            entry.config(validate="key",
+                         validatecommand=(entry.register(validate_input), "%S"))
+            # Bind events for enforcing single character limit and row-column validation
+            entry.bind('<KeyPress>', enforce_char_limit)
+            entry.bind('<KeyRelease>', validate_row_col)
+            # Bind arrow key events to move_cursor function
+            entry.bind('<Up>', lambda event, i=i, j=j: move_cursor(event, i-1, j))
+            entry.bind('<Down>', lambda event, i=i, j=j: move_cursor(event, i+1, j))
+            entry.bind('<Left>', lambda event, i=i, j=j: move_cursor(event, i, j-1))
+            entry.bind('<Right>', lambda event, i=i, j=j: move_cursor(event, i, j+1))
+            row.append(entry)
+        entries.append(row)
 
-# Define the 9x9 grid layout
-grid_frame = tk.Frame(root)
-grid_frame.grid(row=0, column=0)
 
-# Create a 9x9 grid of Entry widgets to represent the Sudoku puzzle
-entries = []
-for i in range(9):
-    row = []
-    for j in range(9):
-        entry = tk.Entry(grid_frame, width=2, font=('Arial', 18), justify='center')
-        entry.grid(row=i, column=j, padx=1, pady=1)
-        # Add constraints to only allow single digits from 1 to 9
-        entry.config(validate="key",
-                     validatecommand=(entry.register(validate_input), "%S"))
-        # Bind events for enforcing single character limit and row-column validation
-        entry.bind('<KeyPress>', enforce_char_limit)
-        entry.bind('<KeyRelease>', validate_row_col)
-        # Bind arrow key events to move_cursor function
-        entry.bind('<Up>', lambda event, i=i, j=j: move_cursor(event, i-1, j))
-        entry.bind('<Down>', lambda event, i=i, j=j: move_cursor(event, i+1, j))
-        entry.bind('<Left>', lambda event, i=i, j=j: move_cursor(event, i, j-1))
-        entry.bind('<Right>', lambda event, i=i, j=j: move_cursor(event, i, j+1))
-        row.append(entry)
-    entries.append(row)
+    # Create the "Solve" button
+    solve_button = tk.Button(root, text="Solve", bg="blue", fg="white", font=('Arial', 12), command=AI_button_click)
+    solve_button.grid(row=1, column=0, pady=10)
 
+    # Create the "Let Me Try" button
+    try_button = tk.Button(root, text="Let Me Try", bg="green", fg="white", font=('Arial', 12), command=user_button_click)
+    try_button.grid(row=2, column=0, pady=10)
 
-# Create the "Solve" button
-solve_button = tk.Button(root, text="Solve", bg="blue", fg="white", font=('Arial', 12), command=AI_button_click)
-solve_button.grid(row=1, column=0, pady=10)
+    # Create radio buttons
+    selected_mode = tk.StringVar()
 
-# Create the "Let Me Try" button
-try_button = tk.Button(root, text="Let Me Try", bg="green", fg="white", font=('Arial', 12), command=user_button_click)
-try_button.grid(row=2, column=0, pady=10)
+    # By default, "Random" mode is selected
+    selected_mode.set("Random")
 
-# Create radio buttons
-selected_mode = tk.StringVar()
+    random_radio = tk.Radiobutton(root, text="Random", variable=selected_mode, value="Random")
+    random_radio.grid(row=3, column=0, pady=5)
 
-# By default, "Random" mode is selected
-selected_mode.set("Random")
+    input_radio = tk.Radiobutton(root, text="Input", variable=selected_mode, value="Input")
+    input_radio.grid(row=4, column=0, pady=5)
 
-random_radio = tk.Radiobutton(root, text="Random", variable=selected_mode, value="Random")
-random_radio.grid(row=3, column=0, pady=5)
+    # Create radio buttons for difficulty levels
+    selected_difficulty = tk.StringVar()
 
-input_radio = tk.Radiobutton(root, text="Input", variable=selected_mode, value="Input")
-input_radio.grid(row=4, column=0, pady=5)
+    # By default, "Easy" difficulty is selected
+    selected_difficulty.set("Easy")
 
-# Create radio buttons for difficulty levels
-selected_difficulty = tk.StringVar()
+    easy_radio = tk.Radiobutton(root, text="Easy", variable=selected_difficulty, value="Easy", font=('Arial', 12))
+    easy_radio.grid(row=5, column=0, pady=5)
 
-# By default, "Easy" difficulty is selected
-selected_difficulty.set("Easy")
+    medium_radio = tk.Radiobutton(root, text="Medium", variable=selected_difficulty, value="Medium", font=('Arial', 12))
+    medium_radio.grid(row=6, column=0, pady=5)
 
-easy_radio = tk.Radiobutton(root, text="Easy", variable=selected_difficulty, value="Easy", font=('Arial', 12))
-easy_radio.grid(row=5, column=0, pady=5)
+    hard_radio = tk.Radiobutton(root, text="Hard", variable=selected_difficulty, value="Hard", font=('Arial', 12))
+    hard_radio.grid(row=7, column=0, pady=5)
 
-medium_radio = tk.Radiobutton(root, text="Medium", variable=selected_difficulty, value="Medium", font=('Arial', 12))
-medium_radio.grid(row=6, column=0, pady=5)
+    # Animation speed of the solved board and the domain view
+    selected_speed = tk.StringVar()
+    selected_speed.set(DEFAULT_SPEED)
 
-hard_radio = tk.Radiobutton(root, text="Hard", variable=selected_difficulty, value="Hard", font=('Arial', 12))
-hard_radio.grid(row=7, column=0, pady=5)
+    speed_menu = tk.OptionMenu(root, selected_speed, *SPEEDS)
+    speed_menu.grid(row=8, column=0, pady=5)
 
 
-root.mainloop()
+    root.mainloop()
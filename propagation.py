@@ -0,0 +1,100 @@
+"""Constraint propagation for the Sudoku CSP.
+
+Domains are a list of candidate masks, one per cell (see ``sudoku_index``); an
+assigned cell has a single-bit domain. Every function takes the board geometry,
+the classic 9x9 by default. Every removal is recorded on a trail as
+``(cell, previous domain)`` so that a search can undo it on backtrack.
+
+Two rules are combined:
+- AC-3 over the binary "not equal" constraints. A value of xi only loses its
+  support on arc (xi, xj) when xj is down to a single value, so this also
+  covers naked singles: a cell reduced to one candidate is removed from all
+  its peers.
+- Hidden singles: a digit that fits in only one cell of a unit is pinned there.
+"""
+from sudoku_index import CLASSIC
+
+
+def ac3(domains, trail, cells=None, geometry=CLASSIC):
+    """Enforce arc consistency; False on a domain wipeout.
+
+    For "not equal" constraints the arc (xi, xj) can only prune when xj is down
+    to one value, so the queue holds singleton cells instead of arcs: popping a
+    cell revises all arcs (peer, cell) at once. cells lists the cells whose
+    domains changed; None starts from every cell.
+    """
+    peers, popcount = geometry.peers, geometry.popcount
+    if cells is None:
+        cells = range(geometry.cells)
+    queue = [cell for cell in cells if popcount[domains[cell]] == 1]
+    while queue:
+        cell = queue.pop()
+        bit = domains[cell]
+        for peer in peers[cell]:
+            domain = domains[peer]
+            if domain & bit:
+                trail.append((peer, domain))
+                domain &= ~bit
+                domains[peer] = domain
+                if not domain:
+                    return False
+                if popcount[domain] == 1:
+                    queue.append(peer)
+    return True
+
+
+def hidden_singles(domains, trail, units=None, geometry=CLASSIC):
+    """Pin digits that fit in only one cell of a unit; return (consistent, changed cells)"""
+    all_candidates = geometry.all_candidates
+    if units is None:
+        units = geometry.units
+    changed = []
+    for unit in units:
+        # Digits seen in at least one / at least two cells of the unit
+        once = twice = 0
+        for cell in unit:
+            domain = domains[cell]
+            twice |= once & domain
+            once |= domain
+        if once != all_candidates:
+            # Some digit has nowhere to go in this unit
+            return False, changed
+
+        only = once & ~twice
+        if not only:
+            continue
+        for cell in unit:
+            pinned = domains[cell] & only
+            if pinned and pinned != domains[cell]:
+                if pinned & (pinned - 1):
+                    # One cell is the only place for two digits
+                    return False, changed
+                trail.append((cell, domains[cell]))
+                domains[cell] = pinned
+                changed.append(cell)
+    return True, changed
+
+
+def propagate(domains, trail, cells=None, geometry=CLASSIC):
+    """Run AC-3 and hidden singles to a fixpoint; False if some domain is wiped out.
+
+    cells lists the cells whose domains just changed; None checks every cell.
+    Hidden singles can only appear in a unit where some domain shrank, so after
+    the first pass only the units touched since the previous scan are checked.
+    """
+    all_units, units_of = geometry.units, geometry.units_of
+    units = all_units if cells is None else {unit for cell in cells for unit in units_of[cell]}
+    mark = len(trail)
+    while True:
+        if not ac3(domains, trail, cells, geometry):
+            return False
+        if units is not all_units:
+            units.update(unit for cell, _ in trail[mark:] for unit in units_of[cell])
+            units = [all_units[unit] for unit in units]
+        mark = len(trail)
+        consistent, cells = hidden_singles(domains, trail, units, geometry)
+        if not consistent:
+            return False
+        if not cells:
+            return True
+        units = set()
@@ -0,0 +1,270 @@
+"""Binary puzzle bank read through mmap.
+
+A store holds 9x9 puzzles in fixed-width records. A record is 41 bytes: the 81
+cells as 4-bit digits (0 for blanks), with the difficulty in the spare 82nd
+nibble. It is followed by another 41 bytes for the solution when the store
+keeps solutions. Records are grouped by difficulty. The 64-byte header holds
+the first record and the count of each difficulty, so picking a random puzzle
+of a difficulty is one offset computation and one 41-byte read from the
+mapped file. Ten million puzzles take 410 MB, or 820 MB with solutions.
+
+    with PuzzleStoreWriter("bank.bin", solutions=True) as writer:
+        writer.add(puzzle, "Hard", solution)
+    with PuzzleStore("bank.bin") as store:
+        puzzle = store.random("Hard")
+
+From the command line:
+
+    python puzzle_store.py import puzzles.txt bank.bin --solutions
+    python puzzle_store.py sample bank.bin --difficulty Hard --count 5
+    python puzzle_store.py info bank.bin
+"""
+import argparse
+import mmap
+import os
+import random
+import shutil
+import struct
+import sys
+from itertools import chain
+
+from sudoku_api import format_grid, load_grid, make_solver, parse_puzzle
+from sudoku_generator import DIFFICULTIES, grade_puzzle
+
+MAGIC = b"SUDOKUPZ"
+VERSION = 1
+# Magic, version, record size, flags, then (first record, count) per difficulty
+HEADER = struct.Struct("<8sHHH2x" + "QQ" * len(DIFFICULTIES))
+HEADER_SIZE = 64
+FLAG_SOLUTIONS = 1
+PACKED_SIZE = 41
+
+# Digit values to hex characters and back; packing goes through bytes.hex/fromhex
+TO_HEX = bytes.maketrans(bytes(range(16)), b"0123456789abcdef")
+FROM_HEX = bytes.maketrans(b"0123456789abcdef", bytes(range(16)))
+
+
+def pack(grid, code=0):
+    """Pack a 9x9 list of rows and a 4-bit code into 41 bytes"""
+    cells = bytearray(chain.from_iterable(grid))
+    cells.append(code)
+    return bytes.fromhex(cells.translate(TO_HEX).decode())
+
+
+def unpack(data):
+    """Return (list of rows, code) from 41 packed bytes"""
+    cells = data.hex().encode().translate(FROM_HEX)
+    return [list(cells[start:start + 9]) for start in range(0, 81, 9)], cells[81]
+
+
+def is_store(path):
+    """True if path is a puzzle store file"""
+    try:
+        with open(path, "rb") as file:
+            return file.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+class PuzzleStore:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        try:
+            header = self.file.read(HEADER_SIZE)
+            if len(header) < HEADER_SIZE or header[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"Not a puzzle store: {path}")
+            fields = HEADER.unpack_from(header)
+            if fields[1] != VERSION:
+                raise ValueError(f"Unsupported puzzle store version {fields[1]}: {path}")
+            self.record_size = fields[2]
+            self.has_solutions = bool(fields[3] & FLAG_SOLUTIONS)
+            # (first record, count) of every difficulty
+            self.sections = dict(zip(DIFFICULTIES, zip(fields[4::2], fields[5::2])))
+            self.count = sum(count for _, count in self.sections.values())
+            # An empty file cannot be mapped
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.count else b""
+        except Exception:
+            self.file.close()
+            raise
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.count:
+            self.map.close()
+        self.file.close()
+
+    def count_of(self, difficulty):
+        return self.sections[difficulty][1]
+
+    def record(self, index):
+        """Return (puzzle, difficulty, solution or None) of record index"""
+        if not 0 <= index < self.count:
+            raise IndexError(f"Record {index} out of range")
+        offset = HEADER_SIZE + index * self.record_size
+        puzzle, code = unpack(self.map[offset:offset + PACKED_SIZE])
+        solution = None
+        if self.has_solutions:
+            solution, _ = unpack(self.map[offset + PACKED_SIZE:offset + 2 * PACKED_SIZE])
+        return puzzle, DIFFICULTIES[code], solution
+
+    def puzzle(self, index):
+        return self.record(index)[0]
+
+    def random(self, difficulty, rng=random):
+        """Return a random puzzle of a difficulty as a list of rows"""
+        return self.random_record(difficulty, rng)[0]
+
+    def random_record(self, difficulty, rng=random):
+        """Return (puzzle, difficulty, solution or None) of a random puzzle of a difficulty"""
+        first, count = self.sections[difficulty]
+        if not count:
+            raise LookupError(f"No {difficulty} puzzles in {self.path}")
+        return self.record(first + rng.randrange(count))
+
+    def records(self, difficulty=None):
+        """Yield every record, or those of one difficulty, in store order"""
+        if difficulty is None:
+            indexes = range(self.count)
+        else:
+            first, count = self.sections[difficulty]
+            indexes = range(first, first + count)
+        for index in indexes:
+            yield self.record(index)
+
+
+class PuzzleStoreWriter:
+    """Writes a new store; records are grouped by difficulty when it is closed.
+
+    Each difficulty is spooled to its own temporary file, so memory stays flat
+    however many puzzles are added.
+    """
+
+    def __init__(self, path, solutions=False):
+        self.path = path
+        self.solutions = solutions
+        self.record_size = PACKED_SIZE * (2 if solutions else 1)
+        self.counts = dict.fromkeys(DIFFICULTIES, 0)
+        self.spools = {deff: open(f"{path}.{deff.lower()}.tmp", "wb") for deff in DIFFICULTIES}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def add(self, puzzle, difficulty, solution=None):
+        if len(puzzle) != 9 or any(len(row) != 9 for row in puzzle):
+            raise ValueError("The puzzle store only holds 9x9 puzzles")
+        if self.solutions and solution is None:
+            raise ValueError("This store keeps solutions; pass the solution")
+        record = pack(puzzle, DIFFICULTIES.index(difficulty))
+        if self.solutions:
+            record += pack(solution)
+        self.spools[difficulty].write(record)
+        self.counts[difficulty] += 1
+
+    def close(self):
+        """Write the header and the grouped records to path"""
+        fields = []
+        first = 0
+        for deff in DIFFICULTIES:
+            fields += [first, self.counts[deff]]
+            first += self.counts[deff]
+        header = HEADER.pack(MAGIC, VERSION, self.record_size, FLAG_SOLUTIONS if self.solutions else 0, *fields)
+        # Build next to the destination and rename, so readers never see half a store
+        temporary = self.path + ".tmp"
+        with open(temporary, "wb") as out:
+            out.write(header.ljust(HEADER_SIZE, b"\0"))
+            for deff in DIFFICULTIES:
+                spool = self.spools[deff]
+                spool.close()
+                with open(spool.name, "rb") as part:
+                    shutil.copyfileobj(part, out)
+                os.remove(spool.name)
+        os.replace(temporary, self.path)
+
+    def discard(self):
+        for spool in self.spools.values():
+            spool.close()
+            os.remove(spool.name)
+
+
+def import_lines(lines, path, solutions=False):
+    """Grade, solve and store puzzle lines; return the number of puzzles stored.
+
+    Lines that cannot be parsed or do not have exactly one solution are
+    skipped: a stored solution has to be the only one, or the game would
+    reject valid entries.
+    """
+    stored = 0
+    with PuzzleStoreWriter(path, solutions) as writer:
+        for line in lines:
+            try:
+                puzzle = parse_puzzle(line)
+            except ValueError:
+                continue
+            # One search finds the solution and proves it unique
+            engine = make_solver(load_grid(puzzle))
+            if engine.count_solutions(limit=2) != 1:
+                continue
+            writer.add(puzzle, grade_puzzle(puzzle), engine.solution)
+            stored += 1
+    return stored
+
+
+def main(argv=None):
+    from batch_solve import read_puzzles
+
+    parser = argparse.ArgumentParser(description="Build and read binary puzzle banks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("import", help="store puzzle lines (one 81-char puzzle per line)")
+    build.add_argument("input", help="puzzle file ('-' for stdin)")
+    build.add_argument("output", help="store file to create")
+    build.add_argument("--solutions", action="store_true", help="also store the solutions")
+    sample = commands.add_parser("sample", help="print random puzzles")
+    sample.add_argument("store")
+    sample.add_argument("--difficulty", choices=DIFFICULTIES, default="Hard")
+    sample.add_argument("--count", type=int, default=1)
+    sample.add_argument("--seed", type=int, help="seed of the random picks")
+    info = commands.add_parser("info", help="print the puzzle counts")
+    info.add_argument("store")
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        stream = sys.stdin if args.input == "-" else open(args.input)
+        try:
+            stored = import_lines(read_puzzles(stream), args.output, args.solutions)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        print(f"Stored {stored} puzzles in {args.output}", file=sys.stderr)
+    elif args.command == "sample":
+        rng = random.Random(args.seed)
+        with PuzzleStore(args.store) as store:
+            if not store.count_of(args.difficulty):
+                parser.error(f"no {args.difficulty} puzzles in {args.store}")
+            for _ in range(args.count):
+                print(format_grid(store.random(args.difficulty, rng)))
+    else:
+        with PuzzleStore(args.store) as store:
+            for deff in DIFFICULTIES:
+                print(f"{deff}: {store.count_of(deff)}")
+            print(f"Total: {len(store)} ({store.record_size} bytes per record"
+                  f"{', with solutions' if store.has_solutions else ''})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
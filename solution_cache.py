@@ -0,0 +1,111 @@
+"""Solution cache keyed by canonical puzzle form.
+
+A puzzle is looked up by its canonical form (see ``canonical``), so any
+relabeled, permuted or transposed variant of a puzzle solved before is answered
+without search, with the stored solution mapped back onto it. Unsolvable
+puzzles are cached too. The cache keeps the ``maxsize`` most recently used
+entries and counts hits, misses and evictions.
+
+With a path, the cache is loaded from that JSON file if it exists and written
+back by ``save()``:
+
+    cache = SolutionCache(path="solutions.json")
+    solution = solve(puzzle, cache=cache)
+    cache.save()
+
+Only 9x9 puzzles are cached; callers solve other boards directly.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from canonical import canonical_form
+
+CACHE_VERSION = 1
+
+
+class SolutionCache:
+    def __init__(self, maxsize=4096, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        # Canonical key -> solution of the representative (81 digits), or None
+        # if it has no solution; least recently used first
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # The solver threads of sudoku_solver.run may share a cache
+        self.lock = threading.Lock()
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": len(self.entries)}
+
+    def solve(self, grid, solver):
+        """Return the solution of a 9x9 list of rows (None if it has none).
+
+        solver(grid) is only called on a miss and must return the solution as
+        a list of rows, or None.
+        """
+        key, transform = canonical_form(grid)
+        with self.lock:
+            found = key in self.entries
+            if found:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                value = self.entries[key]
+            else:
+                self.misses += 1
+        if found:
+            if value is None:
+                return None
+            return transform.invert([[int(char) for char in value[start:start + 9]] for start in range(0, 81, 9)])
+
+        solution = solver(grid)
+        value = None
+        if solution is not None:
+            value = "".join(str(num) for row in transform.apply(solution) for num in row)
+        self._put(key, value)
+        return solution
+
+    def _put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def load(self, path):
+        """Add the entries of a file written by save(); an unreadable file is ignored"""
+        try:
+            with open(path) as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != CACHE_VERSION:
+            return
+        for key, value in data.get("entries", []):
+            self._put(key, value)
+
+    def save(self, path=None):
+        """Write the entries (least recently used first) to path or self.path"""
+        path = path or self.path
+        if not path:
+            raise ValueError("No path to save the cache to")
+        with self.lock:
+            data = {"version": CACHE_VERSION, "entries": list(self.entries.items())}
+        # Write to a temporary file first so a crash never leaves half a cache
+        temporary = path + ".tmp"
+        with open(temporary, "w") as file:
+            json.dump(data, file)
+        os.replace(temporary, path)
@@ -0,0 +1,143 @@
+"""Solve jobs: a solve running on a worker thread, polled from the Tk loop.
+
+    job = SolveJob(puzzle, timeout=30).start(root, on_done=show_result)
+    ...
+    job.cancel()
+
+The job solves its own copy of the puzzle. The engine backend runs in slices
+of ``nodes`` assignments (see ``BitmaskSolver.step``), and the worker checks
+for cancellation and the timeout between slices, so a pathological puzzle
+stops within a slice. The other backends cannot be interrupted: a cancelled or
+timed-out job ends at once and the worker's result is discarded when it
+arrives.
+
+``on_done(job)`` is called from ``root.after`` polling, never from the worker
+thread. This module does not import tkinter.
+"""
+import threading
+import time
+
+from sudoku_api import DEFAULT_BACKEND, load_grid, make_solver
+from sudoku_engine import DEFAULT_STRATEGY, SearchStats
+
+# Job states
+PENDING = "pending"
+RUNNING = "running"
+SOLVED = "solved"
+UNSOLVABLE = "unsolvable"
+CANCELLED = "cancelled"
+TIMED_OUT = "timed out"
+FAILED = "failed"
+
+
+class SolveJob:
+    def __init__(self, grid, strategy=DEFAULT_STRATEGY, backend=DEFAULT_BACKEND, timeout=None,
+                 events=None, nodes=500):
+        self.board = load_grid(grid)
+        self.strategy = strategy
+        self.backend = backend
+        # Seconds before the job gives up (None waits forever)
+        self.timeout = timeout
+        # Optional domain_events.DomainEventQueue fed by the engine
+        self.events = events
+        self.nodes = nodes
+        self.state = PENDING
+        self.result = None
+        self.error = None
+        # Latest search statistics snapshot (a dict, see SearchStats.as_dict)
+        self.progress = None
+        self.started = None
+        self.ended = None
+        self.cancelled = threading.Event()
+        self.finished = threading.Event()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def start(self, root=None, on_done=None, poll_ms=50):
+        """Start the worker; with root, on_done(job) runs on the Tk loop once the job ends"""
+        self.started = time.monotonic()
+        if not self.done:
+            self.state = RUNNING
+        self.thread = threading.Thread(target=self._work, daemon=True)
+        self.thread.start()
+        if root is not None:
+            root.after(poll_ms, self._poll, root, on_done, poll_ms)
+        return self
+
+    def cancel(self):
+        """Ask the job to stop; it ends as cancelled unless it already finished"""
+        self.cancelled.set()
+        if self.backend != "engine":
+            self._finish(CANCELLED)
+
+    @property
+    def done(self):
+        return self.finished.is_set()
+
+    def elapsed(self):
+        """Seconds the job has been running (or ran)"""
+        if self.started is None:
+            return 0.0
+        return (self.ended or time.monotonic()) - self.started
+
+    def wait(self, timeout=None):
+        """Block until the job ends (or timeout seconds pass); return the result"""
+        self.finished.wait(timeout)
+        return self.result
+
+    def _poll(self, root, on_done, poll_ms):
+        if not self.done:
+            # Backends without slices cannot time out on their own
+            if self.backend != "engine" and self._timed_out():
+                self._finish(TIMED_OUT)
+            else:
+                root.after(poll_ms, self._poll, root, on_done, poll_ms)
+                return
+        if on_done:
+            on_done(self)
+
+    def _work(self):
+        stats = SearchStats(on_update=self._update_progress, interval=100)
+        on_change = self.events.emit if self.events else None
+        try:
+            solver = make_solver(self.board, self.strategy, self.backend, stats, on_change)
+            if self.backend == "engine":
+                solver.begin(limit=1)
+                while not solver.step(self.nodes):
+                    if self.cancelled.is_set():
+                        self._finish(CANCELLED)
+                        return
+                    if self._timed_out():
+                        self._finish(TIMED_OUT)
+                        return
+                solved = solver.solutions_found == 1
+            else:
+                solved = solver.solve()
+        except Exception as error:
+            self._finish(FAILED, error=error)
+            return
+        if solved:
+            self._finish(SOLVED, self.board)
+        else:
+            self._finish(UNSOLVABLE)
+
+    def _timed_out(self):
+        return self.timeout is not None and self.elapsed() > self.timeout
+
+    def _update_progress(self, stats):
+        self.progress = stats
+        if self.events:
+            self.events.update_stats(stats)
+
+    def _finish(self, state, result=None, error=None):
+        # The first outcome wins: a result arriving after a cancel is discarded
+        with self.lock:
+            if self.finished.is_set():
+                return
+            self.state = state
+            self.result = result
+            self.error = error
+            self.ended = time.monotonic()
+            self.finished.set()
+        if self.events:
+            self.events.finish(result)
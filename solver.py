@@ -1,11 +1,46 @@
+"""Digit-by-digit solver.
+
+Instead of picking a cell and trying digits, this solver picks a digit and
+places it in every row that still misses it. Digits are handled in order of
+fewest remaining placements (``rem``), so digits that are nearly complete are
+finished first, and within a digit the row with the fewest free columns goes
+first.
+
+The free columns of a (digit, row) pair are kept as bitmasks: per row the
+empty columns, per digit the columns and boxes that already hold it.
+"""
+
+# Columns covered by each combination of the three boxes of a band
+BAND_COLS = tuple(
+    sum(0b111 << (3 * box) for box in range(3) if bits & (1 << box))
+    for bits in range(8)
+)
+
+
+def iter_bits(mask):
+    """Yield the indexes of the set bits of a mask"""
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        yield bit.bit_length() - 1
+
+
 class SudokuSolver:
     def __init__(self, arr):
         self.arr = arr
         self.pos = {}
         self.rem = {}
-        self.graph = {}
+        self.consistent = True
+        self.solutions_found = 0
+        self.solution = None
+        # Search frames, kept so a later search can undo the placements of the last one
+        self.stack = []
+        # Bitmasks: empty columns per row, used rows/columns/boxes per digit
+        self.row_free = [0] * 9
+        self.digit_rows = [0] * 10
+        self.digit_cols = [0] * 10
+        self.digit_boxes = [0] * 10
         self.build_pos_and_rem()
-        self.build_graph()
 
     def printMatrix(self):
         for i in range(0, 9):
@@ -13,108 +48,142 @@ class SudokuSolver:
                 print(str(self.arr[i][j]), end=" ")
             print()
 
-    def is_safe(self, x, y):
-        key = self.arr[x][y]
-        for i in range(0, 9):
-            if i != y and self.arr[x][i] == key:
-                return False
-            if i != x and self.arr[i][y] == key:
-                return False
-
-        r_start = int(x / 3) * 3
-        r_end = r_start + 3
-
-        c_start = int(y / 3) * 3
-        c_end = c_start + 3
-
-        for i in range(r_start, r_end):
-            for j in range(c_start, c_end):
-                if i != x and j != y and self.arr[i][j] == key:
-                    return False
-        return True
-
-    def fill_matrix(self, k, keys, r, rows):
-        for c in self.graph[keys[k]][rows[r]]:
-            if self.arr[rows[r]][c] > 0:
-                continue
-            self.arr[rows[r]][c] = keys[k]
-            if self.is_safe(rows[r], c):
-                if r < len(rows) - 1:
-                    if self.fill_matrix(k, keys, r + 1, rows):
-                        return True
-                    else:
-                        self.arr[rows[r]][c] = 0
-                        continue
-                else:
-                    if k < len(keys) - 1:
-                        if self.fill_matrix(k + 1, keys, 0, list(self.graph[keys[k + 1]].keys())):
-                            return True
-                        else:
-                            self.arr[rows[r]][c] = 0
-                            continue
-                    return True
-            self.arr[rows[r]][c] = 0
-        return False
-
     def build_pos_and_rem(self):
-        for i in range(0, 9):
-            for j in range(0, 9):
-                if self.arr[i][j] > 0:
-                    if self.arr[i][j] not in self.pos:
-                        self.pos[self.arr[i][j]] = []
-                    self.pos[self.arr[i][j]].append([i, j])
-                    if self.arr[i][j] not in self.rem:
-                        self.rem[self.arr[i][j]] = 9
-                    self.rem[self.arr[i][j]] -= 1
-
         for i in range(1, 10):
-            if i not in self.pos:
-                self.pos[i] = []
-            if i not in self.rem:
-                self.rem[i] = 9
-
-    def build_graph(self):
-        for k, v in self.pos.items():
-            if k not in self.graph:
-                self.graph[k] = {}
-
-            row = list(range(0, 9))
-            col = list(range(0, 9))
-
-            for cord in v:
-                row.remove(cord[0])
-                col.remove(cord[1])
+            self.pos[i] = []
+            self.rem[i] = 9
 
-            if len(row) == 0 or len(col) == 0:
+        for i in range(0, 9):
+            for j in range(0, 9):
+                key = self.arr[i][j]
+                if key == 0:
+                    self.row_free[i] |= 1 << j
+                    continue
+                box = (i // 3) * 3 + j // 3
+                if (self.digit_rows[key] >> i | self.digit_cols[key] >> j | self.digit_boxes[key] >> box) & 1:
+                    # The givens already repeat this digit in a row, column or box
+                    self.consistent = False
+                self.place(key, i, j)
+                self.pos[key].append([i, j])
+
+    def place(self, key, row, col):
+        self.arr[row][col] = key
+        self.rem[key] -= 1
+        self.row_free[row] &= ~(1 << col)
+        self.digit_rows[key] |= 1 << row
+        self.digit_cols[key] |= 1 << col
+        self.digit_boxes[key] |= 1 << ((row // 3) * 3 + col // 3)
+
+    def remove(self, key, row, col):
+        self.arr[row][col] = 0
+        self.rem[key] += 1
+        self.row_free[row] |= 1 << col
+        self.digit_rows[key] &= ~(1 << row)
+        self.digit_cols[key] &= ~(1 << col)
+        self.digit_boxes[key] &= ~(1 << ((row // 3) * 3 + col // 3))
+
+    def free_columns(self, key, row):
+        # Empty columns of the row not blocked by key's columns or boxes in this band
+        band_boxes = (self.digit_boxes[key] >> ((row // 3) * 3)) & 0b111
+        return self.row_free[row] & ~self.digit_cols[key] & ~BAND_COLS[band_boxes]
+
+    def next_row(self, key):
+        """Return (row, free column mask) with the fewest options, or None if key is placed everywhere"""
+        best = None
+        best_count = 10
+        missing = ~self.digit_rows[key] & 0x1FF
+        for row in iter_bits(missing):
+            columns = self.free_columns(key, row)
+            count = bin(columns).count("1")
+            if count < best_count:
+                best, best_count = (row, columns), count
+                if count <= 1:
+                    break
+        return best
+
+    def next_digit(self):
+        # The digit with the fewest remaining placements that is not finished
+        remaining = [key for key in range(1, 10) if self.rem[key] > 0]
+        if not remaining:
+            return None
+        return min(remaining, key=lambda key: self.rem[key])
+
+    def fill_matrix(self, limit):
+        """Depth-first search on an explicit stack; True once limit solutions are found.
+
+        Each frame is [digit, row, untried columns, placed column or -1], so a
+        placement costs no Python frame and undoing it needs only the frame.
+        """
+        self.stack = stack = []
+        if self.expand(stack, limit):
+            return True
+        while stack:
+            frame = stack[-1]
+            key, row, columns, col = frame
+            if col >= 0:
+                self.remove(key, row, col)
+            if not columns:
+                stack.pop()
                 continue
+            bit = columns & -columns
+            col = bit.bit_length() - 1
+            frame[2], frame[3] = columns ^ bit, col
+            self.place(key, row, col)
+            if self.expand(stack, limit):
+                return True
+        return False
+
+    def expand(self, stack, limit):
+        # Push the next (digit, row) to fill, or record a solution; True once limit is reached
+        key = self.next_digit()
+        if key is None:
+            self.solutions_found += 1
+            if self.solution is None:
+                self.solution = [list(row) for row in self.arr]
+            return self.solutions_found >= limit
+
+        row, columns = self.next_row(key)
+        stack.append([key, row, columns, -1])
+        return False
 
-            for r in row:
-                for c in col:
-                    if self.arr[r][c] == 0:
-                        if r not in self.graph[k]:
-                            self.graph[k][r] = []
-                        self.graph[k][r].append(c)
+    def reset(self):
+        """Undo the placements of the last search, back to the givens"""
+        for key, row, _, col in reversed(self.stack):
+            if col >= 0:
+                self.remove(key, row, col)
+        self.stack = []
+
+    def count_solutions(self, limit=2):
+        """Count solutions, stopping as soon as limit is reached (None counts all)"""
+        self.reset()
+        self.solutions_found = 0
+        self.solution = None
+        if self.consistent:
+            self.fill_matrix(limit or float("inf"))
+        return self.solutions_found
 
     def solve(self):
-        key_s = list(self.rem.keys())
-        self.fill_matrix(0, key_s, 0, list(self.graph[key_s[0]].keys()))
-        return self.arr
-
-
-# Example usage:
-arr = [
-    [3, 0, 6, 5, 0, 8, 4, 0, 0],
-    [5, 2, 0, 0, 0, 0, 0, 0, 0],
-    [0, 8, 7, 0, 0, 0, 0, 3, 1],
-    [0, 0, 3, 0, 1, 0, 0, 8, 0],
-    [9, 0, 0, 8, 6, 3, 0, 0, 5],
-    [0, 5, 0, 0, 9, 0, 6, 0, 0],
-    [1, 3, 0, 0, 0, 0, 2, 5, 0],
-    [0, 0, 0, 0, 0, 0, 0, 7, 4],
-    [0, 0, 5, 2, 0, 6, 3, 0, 0]
-]
-
-solver = SudokuSolver(arr)
-solution = solver.solve()
-print("Solved Sudoku:")
-solver.printMatrix()
+        """Fill the board in place; return True if a solution was found"""
+        return self.count_solutions(limit=1) == 1
+
+
+if __name__ == "__main__":
+    # Example usage:
+    arr = [
+        [3, 0, 6, 5, 0, 8, 4, 0, 0],
+        [5, 2, 0, 0, 0, 0, 0, 0, 0],
+        [0, 8, 7, 0, 0, 0, 0, 3, 1],
+        [0, 0, 3, 0, 1, 0, 0, 8, 0],
+        [9, 0, 0, 8, 6, 3, 0, 0, 5],
+        [0, 5, 0, 0, 9, 0, 6, 0, 0],
+        [1, 3, 0, 0, 0, 0, 2, 5, 0],
+        [0, 0, 0, 0, 0, 0, 0, 7, 4],
+        [0, 0, 5, 2, 0, 6, 3, 0, 0]
+    ]
+
+    solver = SudokuSolver(arr)
+    if solver.solve():
+        print("Solved Sudoku:")
+        solver.printMatrix()
+    else:
+        print("No solution exists.")
@@ -0,0 +1,99 @@
+"""Headless solving API.
+
+Nothing here imports tkinter, so it can run on display-less machines:
+
+    from sudoku_api import solve
+    solution = solve("..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8..2.3..9..5.1.3..")
+
+Puzzles are 9x9 lists of ints (0 for blanks), ``board.Board`` objects or
+81-character strings using ``.`` or ``0`` for blanks. The engine backend also takes larger boards
+(16x16, 25x25) as lists.
+"""
+from board import Board
+from dlx_solver import DLXSolver
+from solver import SudokuSolver as DigitSolver
+from sudoku_engine import BitmaskSolver, DEFAULT_STRATEGY
+
+# Solver backends: the bitmask CSP engine (which honours the search strategy),
+# the Dancing Links exact-cover solver and the digit-by-digit solver
+BACKENDS = ("engine", "dlx", "digit")
+DEFAULT_BACKEND = "engine"
+
+
+def parse_puzzle(line):
+    """Parse an 81-character puzzle line into a 9x9 board"""
+    line = line.strip()
+    if len(line) != 81:
+        raise ValueError(f"Expected 81 characters, got {len(line)}")
+
+    cells = []
+    for char in line:
+        if char in ".0":
+            cells.append(0)
+        elif char.isdigit():
+            cells.append(int(char))
+        else:
+            raise ValueError(f"Invalid character in puzzle: {char!r}")
+    return [cells[row * 9:row * 9 + 9] for row in range(9)]
+
+
+def format_grid(grid):
+    """Format a 9x9 board as an 81-character line (``.`` for blanks)"""
+    return "".join(str(num) if num else "." for row in grid for num in row)
+
+
+def make_solver(board, strategy=DEFAULT_STRATEGY, backend=DEFAULT_BACKEND, stats=None, on_change=None):
+    """Create a solver for board; every backend has solve() filling the board in place.
+
+    stats and on_change are only used by the engine backend, which is also the
+    only one that handles boards other than 9x9.
+    """
+    if backend == "engine":
+        return BitmaskSolver(board, strategy, on_change=on_change, stats=stats)
+    if backend in BACKENDS and len(board) != 9:
+        raise ValueError(f"The {backend} backend only solves 9x9 boards")
+    if backend == "dlx":
+        return DLXSolver(board)
+    if backend == "digit":
+        return DigitSolver(board)
+    raise ValueError(f"Unknown backend: {backend}")
+
+
+def load_grid(grid):
+    """Return a new list of rows for a puzzle line, list of rows or Board"""
+    if isinstance(grid, str):
+        return parse_puzzle(grid)
+    if isinstance(grid, Board):
+        return grid.to_grid()
+    return [list(row) for row in grid]
+
+
+def solve(grid, strategy=DEFAULT_STRATEGY, backend=DEFAULT_BACKEND, stats=None, cache=None):
+    """Return a solved copy of the puzzle, or None if it has no solution.
+
+    The copy is a Board when a Board is passed, a list of rows otherwise.
+    Pass a sudoku_engine.SearchStats as stats to instrument the engine backend,
+    and a solution_cache.SolutionCache as cache to answer 9x9 puzzles
+    equivalent to one solved before without search.
+    """
+    board = load_grid(grid)
+
+    def search(board):
+        return board if make_solver(board, strategy, backend, stats).solve() else None
+
+    if cache is not None and len(board) == 9:
+        solution = cache.solve(board, search)
+    else:
+        solution = search(board)
+    if solution is not None and isinstance(grid, Board):
+        return Board.from_grid(solution)
+    return solution
+
+
+def count_solutions(grid, limit=2, backend=DEFAULT_BACKEND):
+    """Count the solutions of a puzzle, stopping once limit is reached (None counts all)"""
+    return make_solver(load_grid(grid), backend=backend).count_solutions(limit)
+
+
+def has_unique_solution(grid, backend=DEFAULT_BACKEND):
+    return count_solutions(grid, limit=2, backend=backend) == 1
@@ -2,8 +2,12 @@ import tkinter as tk
 from tkinter import messagebox
 import time
 import threading
+from math import isqrt
 
-from helper import generate_domain_array
+from board import Board, DomainTracker
+
+# Delay before keystrokes are shown in the domain view, in milliseconds
+DOMAIN_REFRESH_MS = 50
 
 
 class SudokuGameGui:
@@ -11,13 +15,53 @@ class SudokuGameGui:
         self.root = root
         self.root.title("Sudoku")
         self.readonly = edit_block  # Flag to indicate if entries are readonly
-        self.sol = puzzle
-        self.create_grid(puzzle, sudoku_board)
+        # Filled in place by the caller once the solver is done (all zeros until then)
+        self.solution = sudoku_board
+        # Board size (9, 16, 25, ...) and box size are taken from the puzzle
+        self.size = len(puzzle)
+        self.box_size = isqrt(self.size)
+        # The board as entered so far and its domains: the authoritative model,
+        # updated only when a cell's value actually changes
+        self.tracker = DomainTracker(Board.from_grid(puzzle))
+        self.filled = sum(1 for num in self.tracker.board.cells if num)
         self.sudoku_domain = sudoku_domain
+        # Cells whose domains changed since the domain view was last refreshed
+        self.pending_domains = set()
+        self.refresh_scheduled = False
+        self.create_grid(puzzle)
+
+    def set_cell(self, row, col, num):
+        """Put num (0 to clear) in the model and queue the domain view refresh"""
+        board = self.tracker.board
+        index = row * self.size + col
+        self.filled += bool(num) - bool(board.cells[index])
+        changed = self.tracker.set(row, col, num)
+        if self.sudoku_domain and changed:
+            self.pending_domains.update(changed)
+            if not self.refresh_scheduled:
+                # Debounce: a burst of keystrokes costs one refresh
+                self.refresh_scheduled = True
+                self.root.after(DOMAIN_REFRESH_MS, self.update_domains)
+
+    def update_domains(self):
+        # Send only the cells whose domains changed to the domain view
+        self.refresh_scheduled = False
+        changed, self.pending_domains = self.pending_domains, set()
+        if changed:
+            self.sudoku_domain.apply_changes(self.tracker.changes(sorted(changed)))
+
+    def conflicts(self, row, col, num):
+        """True if num is already used in the row, column or box of a cell"""
+        tracker = self.tracker
+        used = (tracker.rows[row] | tracker.cols[col] |
+                tracker.boxes[tracker.tables.box_of[row * self.size + col]])
+        return bool(used & (1 << (num - 1)))
+
+    def create_grid(self, puzzle):
+        size, box_size = self.size, self.box_size
 
-    def create_grid(self, puzzle, sudoku_board):
         def validate_input(char):
-            if char.isdigit() and 1 <= int(char) <= 9:
+            if char.isdigit() and 1 <= int(char) <= size:
                 return True
             return False
 
@@ -26,59 +70,46 @@ class SudokuGameGui:
                 return 'break'  # Prevent keyboard input if entries are readonly
 
             entry = event.widget
+            # On boards larger than 9x9 a second digit extends the number if it stays in range
+            text = entry.get() + event.char
+            if not (text.isdigit() and 1 <= int(text) <= size):
+                text = event.char
             if len(entry.get()) > 0:
                 entry.delete(0, tk.END)
-            if event.char.isdigit() and 1 <= int(event.char) <= 9:
-                entry.insert(0, event.char)
+            if event.char.isdigit() and 1 <= int(text) <= size:
+                entry.insert(0, text)
             return 'break'
 
-        def validate_row_col(event):
+        def validate_row_col(event, current_row, current_col):
             if self.readonly:
                 return False  # Prevent validation if entries are readonly
 
             entry = event.widget
-            char = entry.get().strip()
-            current_row, current_col = int(entry.grid_info()["row"]), int(entry.grid_info()["column"])
+            entry_value = entry.get().strip()
+            num = int(entry_value) if entry_value else 0
 
-            # Check if the entry is empty
-            if not char:
+            # Arrow keys, modifiers and retyping the same digit change nothing
+            if num == self.tracker.board[current_row, current_col]:
                 return True
 
-            # Get the current value in the entry
-            entry_value = entry.get().strip()
+            # Check if the number already exists in the same row, column or box;
+            # the cell's own previous digit is a different number
+            if num and self.conflicts(current_row, current_col, num):
+                entry.delete(0, tk.END)
+                self.set_cell(current_row, current_col, 0)
+                return False
 
-            # Check if the number already exists in the same row
-            for col in range(9):
-                if col != current_col and self.entries[current_row][col].get().strip() == entry_value:
-                    entry.delete(0, tk.END)
-                    return False
-
-            # Check if the number already exists in the same column
-            for row in range(9):
-                if row != current_row and self.entries[row][current_col].get().strip() == entry_value:
-                    entry.delete(0, tk.END)
-                    return False
-
-            # Check if the number already exists in the same subgrid (3x3)
-            start_row, start_col = (current_row // 3) * 3, (current_col // 3) * 3
-            for i in range(start_row, start_row + 3):
-                for j in range(start_col, start_col + 3):
-                    if (i != current_row or j != current_col) and self.entries[i][j].get().strip() == entry_value:
-                        entry.delete(0, tk.END)
-                        return False
-
-            # Highlight based on equality to sudoku_board
-            if entry_value != str(sudoku_board[current_row][current_col]):
-                self.highlight_entry(current_row, current_col, 'red')
-            else:
-                self.highlight_entry(current_row, current_col, 'green')
-
-            if self.sudoku_domain:
-                self.sudoku_domain.replace_all_cells(generate_domain_array(self.get_current_puzzle()))
+            self.set_cell(current_row, current_col, num)
+
+            # Check if the entry is empty
+            if not num:
+                return True
+
+            # Highlight based on equality to the solution
+            self.check_entry(current_row, current_col)
 
             # Check if all cells are filled with numbers
-            all_filled = all(entry.get().strip().isdigit() for row in self.entries for entry in row)
-            if all_filled:
+            if self.filled == size * size:
                 self.readonly = True
                 messagebox.showinfo("Congratulations!", "You solved the Sudoku puzzle!")
 
@@ -86,23 +117,25 @@ class SudokuGameGui:
             return True
 
         self.entries = []
-        for i in range(9):
+        # Smaller font on larger boards to keep the window on screen
+        font_size = 18 if box_size <= 3 else 12
+        for i in range(size):
             row = []
-            for j in range(9):
-                entry = tk.Entry(self.root, width=2, font=('Arial', 18), justify='center')
+            for j in range(size):
+                entry = tk.Entry(self.root, width=2, font=('Arial', font_size), justify='center')
                 entry.grid(row=i, column=j, padx=1, pady=1)
                 entry.config(validate="key",
                              validatecommand=(entry.register(validate_input), "%S"))
                 entry.bind('<KeyPress>', enforce_char_limit)
-                entry.bind('<KeyRelease>', validate_row_col)
+                entry.bind('<KeyRelease>', lambda event, i=i, j=j: validate_row_col(event, i, j))
                 row.append(entry)
             self.entries.append(row)
 
         self.generate_puzzle(puzzle)
 
     def generate_puzzle(self, puzzle):
-        for i in range(9):
-            for j in range(9):
+        for i in range(self.size):
+            for j in range(self.size):
                 if puzzle[i][j] != 0:
                     self.entries[i][j].insert(0, puzzle[i][j])
                     self.entries[i][j].config(state='disabled')
@@ -117,35 +150,38 @@ class SudokuGameGui:
 
         self.entries[row][col].config(bg=bg_color)
 
+    def check_entry(self, row, col):
+        # Highlight an entered digit against the solution; cells stay
+        # unmarked while the solution is not known yet (all zeros)
+        num, expected = self.tracker.board[row, col], self.solution[row][col]
+        if num and expected:
+            self.highlight_entry(row, col, 'green' if num == expected else 'red')
+
+    def recheck(self):
+        # Highlight every entered cell, e.g. once the solution has arrived
+        for row in range(self.size):
+            for col in range(self.size):
+                if self.entries[row][col]['state'] != 'disabled':
+                    self.check_entry(row, col)
+
     def write_number(self, row, col, num):
-        if 0 <= row < 9 and 0 <= col < 9:
+        if 0 <= row < self.size and 0 <= col < self.size:
             entry = self.entries[row][col]
             if entry['state'] == 'disabled':
                 raise ValueError("Cannot write to a disabled entry")
             entry.delete(0, tk.END)  # Delete existing content
             entry.insert(0, num)
+            self.set_cell(row, col, int(num))
 
-            # Highlight based on equality to sudoku_board
-            if num != str(self.sol[row][col]):
-                self.highlight_entry(row, col, 'red')
-            else:
-                self.highlight_entry(row, col, 'green')
+            # Highlight based on equality to the solution
+            self.check_entry(row, col)
 
         else:
             raise IndexError("Row and column indices out of bounds")
 
     def get_current_puzzle(self):
-            current_puzzle = []
-            for i in range(9):
-                row_values = []
-                for j in range(9):
-                    entry_value = self.entries[i][j].get().strip()
-                    if entry_value:
-                        row_values.append(int(entry_value))
-                    else:
-                        row_values.append(0)
-                current_puzzle.append(row_values)
-            return current_puzzle
+            # Read from the model rather than the entries
+            return self.tracker.board.to_grid()
 
 
 def test_caller():
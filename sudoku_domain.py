@@ -1,16 +1,17 @@
 import tkinter as tk
 from tkinter import ttk
-import time
-import threading
+from math import isqrt
+from animation import AnimationScheduler, DEFAULT_SPEED
 from helper import generate_domain_array
+from sudoku_index import geometry
 
-def get_color(number):
+def get_color(number, size=9):
     """Generate a color gradient based on domain size (smaller domain = darker color)"""
     if number == 1:
         return "#FF6B6B"  # Bright red for solved cells
     
     # Gradient from blue-green (large domain) to purple (small domain)
-    normalized_number = (9 - number) / 8.0  # Smaller domains get higher values
+    normalized_number = (size - number) / (size - 1)  # Smaller domains get higher values
     
     # Color palette: Blue-green gradient to purple
     if normalized_number < 0.33:  # Larger domains (blue-green)
@@ -32,13 +33,31 @@ def get_color(number):
     return f'#{r:02x}{g:02x}{b:02x}'
 
 
+def cell_style(value, fixed):
+    """Font style of a cell: "fixed" givens, "solved" single values or "domain" lists"""
+    if len(value) == 1:
+        return "fixed" if fixed else "solved"
+    return "domain"
+
+
 class SudokuDomain:
-    def __init__(self, root, cell_data):
+    def __init__(self, root, cell_data, speed=DEFAULT_SPEED):
         self.root = root
-        self.cells = []
-        
-        # Calculate initial possibility count
+        # Highlights and step-by-step updates play from root.after, never by sleeping
+        self.animator = AnimationScheduler(root, speed)
+        # Board size (9, 16, 25, ...) and box size are taken from the cell data
+        self.size = len(cell_data)
+        self.box_size = isqrt(self.size)
+        # One slot per cell, indexed row * size + col, and the cells sharing a
+        # row, column or box with each slot (see sudoku_index)
+        self.cells = [None] * (self.size * self.size)
+        self.peers = geometry(self.box_size).peers
+        
+        # Calculate initial possibility count; from here on the statistics are
+        # running counters adjusted per changed cell (see _track)
         self.total_possibilities = self._count_possibilities(cell_data)
+        self.unfilled_cells = self._count_unfilled_cells(cell_data)
+        self.progress_color = None
         
         # Create main container with gradient background
         self.container = tk.Frame(root, bg="#F0F0F0")
@@ -76,10 +95,15 @@ class SudokuDomain:
         self.possibilities_label.pack(anchor='w')
         
         self.cells_with_multiple_label = tk.Label(self.stats_frame, 
-                                               text=f"Cells with multiple options: {self._count_unfilled_cells(cell_data)}",
+                                               text=f"Cells with multiple options: {self.unfilled_cells}",
                                                font=('Arial', 11), bg="#F0F0F0", fg="#2C3A47")
         self.cells_with_multiple_label.pack(anchor='w', pady=(5,0))
         
+        # Search statistics, filled in while the solver runs
+        self.search_stats_label = tk.Label(self.stats_frame, text="", justify=tk.LEFT,
+                                         font=('Arial', 10), bg="#F0F0F0", fg="#2C3A47")
+        self.search_stats_label.pack(anchor='w', pady=(5,0))
+        
         # Progress bar for solving progress
         self.progress_label = tk.Label(self.stats_frame, text="Solving progress:", 
                                      font=('Arial', 11), bg="#F0F0F0", fg="#2C3A47")
@@ -122,13 +146,13 @@ class SudokuDomain:
     def create_color_legend(self, parent):
         """Create a color legend showing what different colors mean"""
         # Create a frame for the legend items
-        legend_items = [
-            ("1 possibility", get_color(1)),
-            ("2-3 possibilities", get_color(3)),
-            ("4-6 possibilities", get_color(5)),
-            ("7-9 possibilities", get_color(8)),
-            ("Fixed cells", "#DDDDDD")
-        ]
+        # Split domain sizes 2..size into thirds (2-3, 4-6, 7-9 on a 9x9 board)
+        size = self.size
+        bounds = [(2, size // 3), (size // 3 + 1, 2 * size // 3), (2 * size // 3 + 1, size)]
+        legend_items = [("1 possibility", get_color(1, size))]
+        for low, high in bounds:
+            legend_items.append((f"{low}-{high} possibilities", get_color((low + high + 1) // 2, size)))
+        legend_items.append(("Fixed cells", "#DDDDDD"))
         
         for idx, (text, color) in enumerate(legend_items):
             frame = tk.Frame(parent, bg="#F0F0F0")
@@ -166,7 +190,7 @@ class SudokuDomain:
     
     def _calculate_progress(self, cell_data):
         """Calculate solving progress as a percentage"""
-        total_cells = 81
+        total_cells = self.size * self.size
         filled_cells = 0
         
         for row in cell_data:
@@ -177,27 +201,30 @@ class SudokuDomain:
         return (filled_cells / total_cells) * 100
 
     def create_grid(self, cell_data):
-        # Create the outer 3x3 grid segments
-        for segment_row in range(3):
-            for segment_col in range(3):
+        # Create the outer grid segments, one per box
+        box_size = self.box_size
+        # Shrink the cells on larger boards to keep the window on screen
+        cell_size = 65 * 3 // box_size
+        for segment_row in range(box_size):
+            for segment_col in range(box_size):
                 segment_frame = tk.Frame(self.grid_frame, bg="#333333", padx=2, pady=2)
                 segment_frame.grid(row=segment_row, column=segment_col, padx=3, pady=3)
                 
-                # Create the inner 3x3 cells within each segment
-                for i in range(3):
-                    for j in range(3):
-                        row = segment_row * 3 + i
-                        col = segment_col * 3 + j
+                # Create the inner cells within each segment
+                for i in range(box_size):
+                    for j in range(box_size):
+                        row = segment_row * box_size + i
+                        col = segment_col * box_size + j
                         
                         cell_value = cell_data[row][col]["value"]
                         cell_color = "#DDDDDD"  # Default gray for fixed cells
                         
                         if cell_data[row][col]["color"] == "white":
                             cell_value = cell_data[row][col]["domain"]
-                            cell_color = get_color(len(cell_value))
+                            cell_color = get_color(len(cell_value), self.size)
                         
                         # Create a frame for each cell
-                        cell = tk.Frame(segment_frame, width=65, height=65, 
+                        cell = tk.Frame(segment_frame, width=cell_size, height=cell_size, 
                                        bg=cell_color, highlightbackground="#666666",
                                        highlightthickness=1)
                         cell.grid(row=i, column=j, padx=1, pady=1)
@@ -208,246 +235,251 @@ class SudokuDomain:
                         cell.grid_rowconfigure(0, weight=1)
                         
                         # Create a label for the domain values
-                        label = tk.Label(cell, bg=cell_color, font=('Arial', 9), justify='center')
+                        label = tk.Label(cell, bg=cell_color, font=('Arial', self.domain_font_size()), justify='center')
                         label.grid(sticky='nsew')
                         
-                        if len(cell_value) == 1 and cell_data[row][col]["color"] == "gray":
-                            # For fixed cells, make the font larger and bold
-                            label.config(font=('Arial', 14, 'bold'), fg="#2C3E50")
-                        elif len(cell_value) == 1:
-                            # For solved cells, make the font larger
-                            label.config(font=('Arial', 14), fg="#2C3E50")
+                        is_fixed = cell_data[row][col]["color"] == "gray"
+                        style = cell_style(cell_value, is_fixed)
+                        if style != "domain":
+                            # Fixed cells get a larger bold font, solved cells a larger one
+                            self._apply_style(label, style)
                         
                         # Format the domain values in a clean way
                         display_text = self.format_domain_text(cell_value)
                         label.config(text=display_text)
                         
-                        self.cells.append({
+                        # The last rendered state, compared against on every update
+                        self.cells[row * self.size + col] = {
                             "row": row, "col": col,
                             "frame": cell, "label": label, 
-                            "value": cell_value, "fixed": cell_data[row][col]["color"] == "gray"
-                        })
+                            "value": cell_value, "fixed": is_fixed,
+                            "color": cell_color, "style": style
+                        }
 
     def format_domain_text(self, domain_values):
-        """Format domain values in a clean 3x3 grid for display"""
+        """Format domain values in a clean box-shaped grid (3x3 on a 9x9 board) for display"""
         if len(domain_values) == 1:
             # For solved cells, display the value prominently
             return str(domain_values[0])
         
-        # Create a 3x3 grid of possible values
-        grid = [" " for _ in range(9)]
+        # Create a grid of possible values, padded to the widest digit
+        width = len(str(self.size))
+        grid = [" " * width for _ in range(self.size)]
         for val in domain_values:
-            grid[val-1] = str(val)
+            grid[val-1] = str(val).rjust(width)
         
-        return f"{grid[0]} {grid[1]} {grid[2]}\n{grid[3]} {grid[4]} {grid[5]}\n{grid[6]} {grid[7]} {grid[8]}"
+        box_size = self.box_size
+        return "\n".join(" ".join(grid[start:start + box_size]) for start in range(0, self.size, box_size))
+
+    def domain_font_size(self):
+        # Domain text shrinks with the number of digits per cell
+        return {3: 9, 4: 6}.get(self.box_size, 5)
 
     def update_cell(self, row, col, new_value):
         """Update a single cell with new domain values"""
-        # Find the cell at the specified position
-        old_domain_size = 0
+        cell = self.cells[row * self.size + col]
+        cell_color = "#DDDDDD" if cell["fixed"] else get_color(len(new_value), self.size)
         
-        for cell in self.cells:
-            if cell["row"] == row and cell["col"] == col:
-                old_domain_size = len(cell["value"])
-                cell_color = "#DDDDDD" if cell["fixed"] else get_color(len(new_value))
-                
-                # Add a brief highlight effect
-                cell["frame"].config(bg="#FFCC99")
-                self.root.update_idletasks()
-                time.sleep(0.05)
-                
-                # Update the cell's visual appearance
-                cell["frame"].config(bg=cell_color)
-                cell["label"].config(bg=cell_color)
-                
-                # Update font based on domain size
-                if len(new_value) == 1:
-                    cell["label"].config(font=('Arial', 14), fg="#2C3E50")
-                else:
-                    cell["label"].config(font=('Arial', 9), fg="black")
-                
-                # Update the text with formatted domain values
-                display_text = self.format_domain_text(new_value)
-                cell["label"].config(text=display_text)
-                
-                # Update cell data
-                cell["value"] = new_value
-                
-                # Update possibility counter (subtract removed possibilities)
-                self.total_possibilities -= (old_domain_size - len(new_value))
-                self.update_statistics()
-                
-                # Force update to show changes immediately
-                self.root.update_idletasks()
-                break
+        # Update the cell's visual appearance
+        cell["frame"].config(bg=cell_color)
+        cell["label"].config(bg=cell_color)
+        cell["color"] = cell_color
+        
+        # Add a brief highlight effect, fading back to the cell color
+        self._highlight(cell)
+        
+        # Update font based on domain size
+        style = "solved" if len(new_value) == 1 else "domain"
+        self._apply_style(cell["label"], style)
+        cell["style"] = style
+        
+        # Update the text with formatted domain values
+        display_text = self.format_domain_text(new_value)
+        cell["label"].config(text=display_text)
+        
+        # Update cell data and the counters
+        self._track(cell, new_value, cell["fixed"])
+        cell["value"] = new_value
+        self.update_statistics()
 
     def assign_digit(self, row, col, digit):
         """Assign a digit to a cell and update related cells with animation"""
-        # Find the target cell
-        target_cell = None
-        old_domain_size = 0
-        
-        for cell in self.cells:
-            if cell["row"] == row and cell["col"] == col:
-                target_cell = cell
-                old_domain_size = len(cell["value"])
-                break
-        
-        if not target_cell:
-            return
-            
-        # Highlight the cell being assigned with a pulse animation
-        self._pulse_highlight(target_cell["frame"], "#FF9999", "#FFDDDD", 3)
+        target_cell = self.cells[row * self.size + col]
         
         # Set the value
+        self._track(target_cell, [digit], target_cell["fixed"])
         target_cell["value"] = [digit]
         display_text = self.format_domain_text([digit])
-        target_cell["label"].config(text=display_text, font=('Arial', 14), fg="#2C3E50")
+        target_cell["label"].config(text=display_text)
+        self._apply_style(target_cell["label"], "solved")
+        target_cell["style"] = "solved"
         
         # Update the cell color to indicate solved state
-        cell_color = get_color(1)
+        cell_color = get_color(1, self.size)
         target_cell["frame"].config(bg=cell_color)
         target_cell["label"].config(bg=cell_color)
+        target_cell["color"] = cell_color
+        
+        # Highlight the cell being assigned with a pulse animation
+        self._pulse_highlight(target_cell, "#FF9999", "#FFDDDD", 3)
         
-        # Update possibility counter
-        self.total_possibilities -= (old_domain_size - 1)
         self.update_statistics()
         
         # Update related cells in the same row, column and box
         self._update_related_cells(row, col, digit)
     
-    def _pulse_highlight(self, widget, color1, color2, repeats=3):
-        """Create a pulsing highlight effect"""
-        original_bg = widget.cget("bg")
-        
-        for _ in range(repeats):
-            widget.config(bg=color1)
-            self.root.update_idletasks()
-            time.sleep(0.1)
-            widget.config(bg=color2)
-            self.root.update_idletasks()
-            time.sleep(0.1)
-        
-        widget.config(bg=original_bg)
-        
+    def _pulse_highlight(self, cell, color1, color2, repeats=3):
+        """Create a pulsing highlight effect, ending on the cell's color"""
+        self.animator.pulse(cell["frame"], color1, color2, lambda: cell["color"], repeats)
+
+    def _highlight(self, cell, color="#FFCC99"):
+        """Flash a cell and fade it back to its color"""
+        self.animator.flash(cell["frame"], color, lambda: cell["color"])
+        
+    def _track(self, cell, new_value, is_fixed):
+        """Adjust the running statistics for a cell about to change to new_value"""
+        self.total_possibilities += len(new_value) - len(cell["value"])
+        was_unfilled = not cell["fixed"] and len(cell["value"]) > 1
+        is_unfilled = not is_fixed and len(new_value) > 1
+        self.unfilled_cells += is_unfilled - was_unfilled
+
     def update_statistics(self):
-        """Update the statistics display"""
-        # Count unfilled cells
-        unfilled_cells = 0
-        for cell in self.cells:
-            if not cell["fixed"] and len(cell["value"]) > 1:
-                unfilled_cells += 1
+        """Update the statistics display from the running counters"""
+        unfilled_cells = self.unfilled_cells
         
         # Update labels
         self.possibilities_label.config(text=f"Remaining possibilities: {self.total_possibilities}")
         self.cells_with_multiple_label.config(text=f"Cells with multiple options: {unfilled_cells}")
         
         # Update progress bar
-        filled_cells = 81 - unfilled_cells
-        progress = (filled_cells / 81) * 100
+        total_cells = self.size * self.size
+        filled_cells = total_cells - unfilled_cells
+        progress = (filled_cells / total_cells) * 100
         self.progress_bar["value"] = progress
         
-        # Update colors based on progress
+        # Update colors based on progress, only when the band changes
         if progress > 75:
-            self.progress_style.configure("Custom.Horizontal.TProgressbar", background='#26de81')
+            color = '#26de81'
         elif progress > 50:
-            self.progress_style.configure("Custom.Horizontal.TProgressbar", background='#fed330')
+            color = '#fed330'
         else:
-            self.progress_style.configure("Custom.Horizontal.TProgressbar", background='#5758BB')
+            color = '#5758BB'
+        if color != self.progress_color:
+            self.progress_color = color
+            self.progress_style.configure("Custom.Horizontal.TProgressbar", background=color)
+        
+    def show_search_stats(self, stats):
+        """Display a SearchStats snapshot (see sudoku_engine.SearchStats.as_dict)"""
+        phase_ms = stats["phase_ms"]
+        self.search_stats_label.config(text=(
+            f"Nodes: {stats['nodes']}   Backtracks: {stats['backtracks']}\n"
+            f"Max depth: {stats['max_depth']}   Wipeouts: {stats['wipeouts']}\n"
+            f"Propagations: {stats['propagations']}\n"
+            f"Propagation: {phase_ms['initial_propagation'] + phase_ms['assign']:.1f} ms   "
+            f"Select: {phase_ms['select']:.1f} ms"
+        ))
         
     def _update_related_cells(self, row, col, digit):
         """Update all cells affected by placing a digit at (row, col)"""
         # Get all cells in the same row, column, and box
-        affected_cells = []
-        
-        for cell in self.cells:
-            r, c = cell["row"], cell["col"]
-            same_row = r == row and c != col
-            same_col = c == col and r != row
-            same_box = (r // 3 == row // 3 and c // 3 == col // 3 and 
-                       not (r == row and c == col))
-            
-            if same_row or same_col or same_box:
-                affected_cells.append(cell)
-        
-        # Remove the digit from affected cells
-        domains_changed = False
+        affected_cells = [self.cells[peer] for peer in self.peers[row * self.size + col]]
         
+        # Remove the digit from the affected cells one step at a time
         for cell in affected_cells:
-            if digit in cell["value"] and len(cell["value"]) > 1:
-                # Highlight cell briefly
-                cell["frame"].config(bg="#FFCC99")
-                self.root.update_idletasks()
-                time.sleep(0.03)
-                
-                # Update domain
-                cell["value"].remove(digit)
-                display_text = self.format_domain_text(cell["value"])
-                cell["label"].config(text=display_text)
-                
-                # Update color
-                cell_color = get_color(len(cell["value"]))
-                cell["frame"].config(bg=cell_color)
-                cell["label"].config(bg=cell_color)
-                
-                # Update font if this cell now has only one possibility
-                if len(cell["value"]) == 1:
-                    cell["label"].config(font=('Arial', 14), fg="#2C3E50")
-                
-                self.total_possibilities -= 1
-                domains_changed = True
-                
-                self.root.update_idletasks()
-        
-        if domains_changed:
+            if digit in cell["value"]:
+                self.animator.add(self._remove_candidate, cell, digit)
+
+    def _remove_candidate(self, cell, digit):
+        """Animation step of _update_related_cells"""
+        if digit in cell["value"] and len(cell["value"]) > 1:
+            # Update domain
+            new_value = [value for value in cell["value"] if value != digit]
+            self._track(cell, new_value, cell["fixed"])
+            cell["value"] = new_value
+            display_text = self.format_domain_text(cell["value"])
+            cell["label"].config(text=display_text)
+            
+            # Update color
+            cell_color = get_color(len(cell["value"]), self.size)
+            cell["frame"].config(bg=cell_color)
+            cell["label"].config(bg=cell_color)
+            cell["color"] = cell_color
+            
+            # Update font if this cell now has only one possibility
+            if len(cell["value"]) == 1:
+                self._apply_style(cell["label"], "solved")
+                cell["style"] = "solved"
+            
+            # Highlight cell briefly
+            self._highlight(cell)
             self.update_statistics()
 
     def replace_all_cells(self, new_cell_data):
-        """Replace all cell data with new values"""
-        # Calculate new total possibilities
-        new_possibilities = self._count_possibilities(new_cell_data)
-        possibility_diff = self.total_possibilities - new_possibilities
-        self.total_possibilities = new_possibilities
-        
-        # Create a flattened dictionary for easier lookup
-        cell_dict = {}
-        for cell in self.cells:
-            key = (cell["row"], cell["col"])
-            cell_dict[key] = cell
-        
-        # Update each cell
-        for i in range(9):
-            for j in range(9):
-                new_value = new_cell_data[i][j]["value"]
-                if new_cell_data[i][j]["color"] == "white":
-                    new_value = new_cell_data[i][j]["domain"]
-                
-                cell = cell_dict.get((i, j))
-                if cell:
-                    # Update cell color and value
-                    is_fixed = new_cell_data[i][j]['color'] == "gray"
-                    cell_color = "#DDDDDD" if is_fixed else get_color(len(new_value))
-                    
-                    cell["frame"].config(bg=cell_color)
-                    cell["label"].config(bg=cell_color)
-                    
-                    # Update font based on domain size
-                    if len(new_value) == 1:
-                        if is_fixed:
-                            cell["label"].config(font=('Arial', 14, 'bold'), fg="#2C3E50")
-                        else:
-                            cell["label"].config(font=('Arial', 14), fg="#2C3E50")
-                    else:
-                        cell["label"].config(font=('Arial', 9), fg="black")
-                    
-                    display_text = self.format_domain_text(new_value)
-                    cell["label"].config(text=display_text)
-                    
-                    cell["value"] = new_value
-                    cell["fixed"] = is_fixed
+        """Replace all cell data with new values, redrawing only the cells that differ"""
+        changed = False
+        for cell, cell_data in zip(self.cells, (data for row in new_cell_data for data in row)):
+            if self._render_cell(cell, cell_data):
+                changed = True
         
         # Update statistics
-        self.update_statistics()
+        if changed:
+            self.update_statistics()
+
+    def apply_changes(self, changes):
+        """Update many cells in a single pass.
+
+        changes is an iterable of (row, col, cell data) in the format of
+        generate_domain_array, e.g. from board.DomainTracker.changes.
+        """
+        cells, size = self.cells, self.size
+        changed = False
+        for row, col, cell_data in changes:
+            if self._render_cell(cells[row * size + col], cell_data):
+                changed = True
+        if changed:
+            self.update_statistics()
+
+    def _render_cell(self, cell, cell_data):
+        """Bring a cell up to date; only what differs from the last render is sent to Tk.
+
+        Returns False when nothing changed.
+        """
+        new_value = cell_data["value"]
+        if cell_data["color"] == "white":
+            new_value = cell_data["domain"]
+        is_fixed = cell_data['color'] == "gray"
+        if new_value == cell["value"] and is_fixed == cell["fixed"]:
+            return False
+        self._track(cell, new_value, is_fixed)
+        
+        # Update cell color
+        cell_color = "#DDDDDD" if is_fixed else get_color(len(new_value), self.size)
+        if cell_color != cell["color"]:
+            cell["frame"].config(bg=cell_color)
+            cell["label"].config(bg=cell_color)
+            cell["color"] = cell_color
+        
+        # Update font based on domain size
+        style = cell_style(new_value, is_fixed)
+        if style != cell["style"]:
+            self._apply_style(cell["label"], style)
+            cell["style"] = style
+        
+        if new_value != cell["value"]:
+            display_text = self.format_domain_text(new_value)
+            cell["label"].config(text=display_text)
+        
+        cell["value"] = new_value
+        cell["fixed"] = is_fixed
+        return True
+
+    def _apply_style(self, label, style):
+        if style == "fixed":
+            label.config(font=('Arial', 14, 'bold'), fg="#2C3E50")
+        elif style == "solved":
+            label.config(font=('Arial', 14), fg="#2C3E50")
+        else:
+            label.config(font=('Arial', self.domain_font_size()), fg="black")
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -477,15 +509,7 @@ if __name__ == "__main__":
     sudoku_grid = SudokuDomain(root, cell_data)
     
     # Demo: Update a cell after a delay (simulating solving)
-    def demo_update():
-        time.sleep(1)
-        sudoku_grid.assign_digit(0, 2, 4)
-        time.sleep(1)
-        sudoku_grid.assign_digit(0, 3, 6)
-    
-    # Run the demo in a separate thread
-    # thread = threading.Thread(target=demo_update)
-    # thread.daemon = True
-    # thread.start()
+    # root.after(1000, sudoku_grid.assign_digit, 0, 2, 4)
+    # root.after(2000, sudoku_grid.assign_digit, 0, 3, 6)
 
     root.mainloop()
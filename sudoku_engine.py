@@ -0,0 +1,390 @@
+"""Bitmask constraint engine for Sudoku.
+
+Every row, column and box keeps an occupancy mask (bit ``d - 1`` set means
+digit ``d`` is used). The masks are updated incrementally on
+assign/unassign, so the candidates of a cell are a couple of bitwise ops
+instead of a scan over its row, column and box.
+
+On top of the masks every cell keeps its own domain mask (a single bit once
+assigned). Assigning a digit forward-checks the cell's peers (removes the
+digit from their domains) and records the removals on a trail so that
+backtracking restores them. With propagation enabled the engine maintains
+arc consistency instead (MAC): ``propagation.propagate`` runs once before the
+search and after every assignment.
+
+The search is depth-first on an explicit stack rather than recursive, so it
+has no recursion limit and ``begin``/``step`` can run it in slices, e.g. from
+Tk ``after`` callbacks.
+
+Passing a ``SearchStats`` instance turns on instrumentation (node, backtrack
+and wipeout counters, phase timers); without one the search only pays for a
+few ``is None`` checks per node.
+
+Boards of any box size work (9x9, 16x16, 25x25, ...); the size is taken from
+the board and the index tables come from ``sudoku_index.geometry``.
+
+This module has no GUI dependencies and can be used headless.
+"""
+
+from time import perf_counter
+
+from propagation import propagate
+from sudoku_index import geometry_of
+
+# Search strategies:
+#   first      - first empty cell in row-major order
+#   mrv        - minimum remaining values (smallest domain first)
+#   mrv_degree - MRV, ties broken by the number of unassigned peers
+#   lcv        - MRV + degree, values tried least-constraining first
+STRATEGIES = ("first", "mrv", "mrv_degree", "lcv")
+DEFAULT_STRATEGY = "mrv"
+
+
+def digit_of(bit):
+    """Return the digit stored in a single-bit mask"""
+    return bit.bit_length()
+
+
+def iter_digits(mask):
+    """Yield the digits of a candidate mask in increasing order"""
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        yield bit.bit_length()
+
+
+class SearchStats:
+    """Counters and phase timers filled in by an instrumented search"""
+
+    PHASES = ("initial_propagation", "select", "assign", "total")
+
+    def __init__(self, on_update=None, interval=1000):
+        # Optional callback(stats dict), called every interval nodes and at the end
+        self.on_update = on_update
+        self.interval = interval
+        self.nodes = 0
+        self.backtracks = 0
+        self.max_depth = 0
+        self.wipeouts = 0
+        self.propagations = 0
+        self.solutions = 0
+        self.phase_times = dict.fromkeys(self.PHASES, 0.0)
+
+    def as_dict(self):
+        return {
+            "nodes": self.nodes,
+            "backtracks": self.backtracks,
+            "max_depth": self.max_depth,
+            "wipeouts": self.wipeouts,
+            "propagations": self.propagations,
+            "solutions": self.solutions,
+            "phase_ms": {phase: seconds * 1000 for phase, seconds in self.phase_times.items()},
+        }
+
+    def publish(self):
+        if self.on_update:
+            self.on_update(self.as_dict())
+
+
+class BitmaskSolver:
+    def __init__(self, board, strategy=DEFAULT_STRATEGY, on_change=None, propagation=True, stats=None):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy: {strategy}")
+
+        self.board = board
+        self.geometry = geometry = geometry_of(board)
+        self.size = size = geometry.size
+        # Tables used on every assignment, bound here to skip a lookup
+        self.box_of = geometry.box_of
+        self.peers = geometry.peers
+        self.popcount = geometry.popcount
+        self.strategy = strategy
+        self.propagation = propagation
+        # Optional callback(row, col, num) fired after every assign (num > 0)
+        # and unassign (num == 0)
+        self.on_change = on_change
+        # Optional SearchStats collecting instrumentation
+        self.stats = stats
+        self.rows = [0] * size
+        self.cols = [0] * size
+        self.boxes = [0] * size
+        self.cells = [0] * geometry.cells
+        self.domains = [0] * geometry.cells
+        self.empty_cells = []
+        self.consistent = True
+        # Pruning trail of (cell, previous domain) and the trail
+        # length at each assignment, so unassign can undo its removals
+        self.trail = []
+        self.marks = []
+        self.solutions_found = 0
+        self.solution = None
+        self.limit = None
+        self.stack = []
+        self.done = False
+
+        row_of, col_of, box_of = geometry.row_of, geometry.col_of, geometry.box_of
+        for index in range(geometry.cells):
+            num = board[row_of[index]][col_of[index]]
+            if num == 0:
+                self.empty_cells.append(index)
+                continue
+            bit = 1 << (num - 1)
+            row, col, box = row_of[index], col_of[index], box_of[index]
+            if (self.rows[row] | self.cols[col] | self.boxes[box]) & bit:
+                # The givens already break a constraint
+                self.consistent = False
+            self.rows[row] |= bit
+            self.cols[col] |= bit
+            self.boxes[box] |= bit
+            self.cells[index] = num
+            self.domains[index] = bit
+
+        for index in self.empty_cells:
+            self.domains[index] = self.candidates(row_of[index], col_of[index])
+            if self.domains[index] == 0:
+                self.consistent = False
+
+    def candidates(self, row, col):
+        # Digits not yet used in the cell's row, column and box
+        box = self.box_of[row * self.size + col]
+        return self.geometry.all_candidates & ~(self.rows[row] | self.cols[col] | self.boxes[box])
+
+    def is_valid_move(self, row, col, num):
+        return bool(self.candidates(row, col) & (1 << (num - 1)))
+
+    def exclude(self, row, col, num):
+        """Rule num out for an empty cell before solving, e.g. to test uniqueness"""
+        index = row * self.size + col
+        self.trail.append((index, self.domains[index]))
+        self.domains[index] &= ~(1 << (num - 1))
+        if self.domains[index] == 0:
+            self.consistent = False
+
+    def assign(self, row, col, num):
+        """Place num and prune the peers (FC or MAC); False if a domain is wiped out"""
+        index = row * self.size + col
+        bit = 1 << (num - 1)
+        self.rows[row] |= bit
+        self.cols[col] |= bit
+        self.boxes[self.box_of[index]] |= bit
+        self.cells[index] = num
+        self.board[row][col] = num
+        self.marks.append(len(self.trail))
+        if self.domains[index] != bit:
+            self.trail.append((index, self.domains[index]))
+            self.domains[index] = bit
+        if self.on_change:
+            self.on_change(row, col, num)
+
+        if self.propagation:
+            if self.stats is not None:
+                self.stats.propagations += 1
+            return propagate(self.domains, self.trail, [index], self.geometry)
+
+        cells, domains, trail = self.cells, self.domains, self.trail
+        for peer in self.peers[index]:
+            if cells[peer] == 0 and domains[peer] & bit:
+                trail.append((peer, domains[peer]))
+                domains[peer] &= ~bit
+                if domains[peer] == 0:
+                    return False
+        return True
+
+    def unassign(self, row, col):
+        """Undo the most recent assign, restoring the pruned peer domains"""
+        index = row * self.size + col
+        bit = ~(1 << (self.cells[index] - 1))
+        self.rows[row] &= bit
+        self.cols[col] &= bit
+        self.boxes[self.box_of[index]] &= bit
+        self.cells[index] = 0
+        self.board[row][col] = 0
+
+        mark = self.marks.pop()
+        domains, trail = self.domains, self.trail
+        while len(trail) > mark:
+            peer, domain = trail.pop()
+            domains[peer] = domain
+        if self.on_change:
+            self.on_change(row, col, 0)
+
+    def select_cell(self):
+        """Return the next cell to branch on, or None when the board is full"""
+        cells, domains = self.cells, self.domains
+        if self.strategy == "first":
+            for index in self.empty_cells:
+                if cells[index] == 0:
+                    return index
+            return None
+
+        popcount = self.popcount
+        best = None
+        best_size = self.size + 1
+        ties = []
+        for index in self.empty_cells:
+            if cells[index] == 0:
+                size = popcount[domains[index]]
+                if size < best_size:
+                    best, best_size = index, size
+                    ties = [index]
+                    if size <= 1:
+                        return index
+                elif size == best_size:
+                    ties.append(index)
+
+        if self.strategy == "mrv" or len(ties) < 2:
+            return best
+        # Degree heuristic: prefer the cell constraining most unassigned peers
+        return max(ties, key=self.degree)
+
+    def degree(self, index):
+        cells = self.cells
+        return sum(1 for peer in self.peers[index] if cells[peer] == 0)
+
+    def order_values(self, index):
+        """Return the digits to try for a cell, in strategy order"""
+        if self.strategy != "lcv":
+            return list(iter_digits(self.domains[index]))
+
+        # Least-constraining value: try digits that prune the fewest peers first
+        cells, domains = self.cells, self.domains
+        peers = [peer for peer in self.peers[index] if cells[peer] == 0]
+
+        def ruled_out(num):
+            bit = 1 << (num - 1)
+            return sum(1 for peer in peers if domains[peer] & bit)
+
+        return sorted(iter_digits(domains[index]), key=ruled_out)
+
+    def count_solutions(self, limit=2):
+        """Count solutions, stopping as soon as limit is reached (None counts all).
+
+        The propagation run before search is shared by every branch, so a
+        uniqueness check (limit=2) costs about as much as a single solve. The
+        first solution found is kept in self.solution.
+        """
+        self.begin(limit)
+        self.step()
+        return self.solutions_found
+
+    def begin(self, limit=2):
+        """Prepare a resumable search for up to limit solutions; drive it with step()"""
+        # A previous search may have left its assignments on the board
+        self.reset()
+        self.solutions_found = 0
+        self.solution = None
+        self.limit = limit or float("inf")
+        # One (cell, remaining values) frame per assignment: the search runs on
+        # this explicit stack and the trail, so it needs no Python frame per
+        # level and can stop and resume between any two assignments
+        self.stack = []
+        self.done = False
+        stats = self.stats
+        start = perf_counter()
+        if self.consistent and self._propagate_root():
+            self._expand()
+        else:
+            self.done = True
+        if stats is not None:
+            stats.phase_times["total"] += perf_counter() - start
+            if self.done:
+                self._publish_result()
+
+    def reset(self):
+        """Undo the assignments of a finished or paused search, back to the givens"""
+        row_of, col_of, cells = self.geometry.row_of, self.geometry.col_of, self.cells
+        for index, _ in reversed(self.stack):
+            if cells[index]:
+                self.unassign(row_of[index], col_of[index])
+        self.stack = []
+
+    def step(self, max_nodes=None):
+        """Run the search for up to max_nodes assignments (None runs to the end).
+
+        Returns True once the search is finished: limit solutions were found (the
+        board holds the last one) or the search space is exhausted (the board is
+        back to the givens). Until then the board holds the current partial
+        assignment.
+        """
+        stack, cells, stats = self.stack, self.cells, self.stats
+        row_of, col_of = self.geometry.row_of, self.geometry.col_of
+        start = perf_counter()
+        steps = 0
+        while stack and not self.done:
+            if max_nodes is not None and steps >= max_nodes:
+                break
+            index, values = stack[-1]
+            row, col = row_of[index], col_of[index]
+            if cells[index]:
+                # Back from the previous value of this cell
+                self.unassign(row, col)
+                if stats is not None:
+                    stats.backtracks += 1
+            num = next(values, 0)
+            if not num:
+                stack.pop()
+                continue
+
+            steps += 1
+            if stats is None:
+                consistent = self.assign(row, col, num)
+            else:
+                assign_start = perf_counter()
+                consistent = self.assign(row, col, num)
+                stats.phase_times["assign"] += perf_counter() - assign_start
+                if not consistent:
+                    stats.wipeouts += 1
+            if consistent:
+                self._expand()
+
+        if not stack:
+            self.done = True
+        if stats is not None:
+            stats.phase_times["total"] += perf_counter() - start
+            if self.done:
+                self._publish_result()
+        return self.done
+
+    def _expand(self):
+        """Open a search node: push the next cell to branch on, or record a solution"""
+        stats = self.stats
+        if stats is None:
+            index = self.select_cell()
+        else:
+            stats.nodes += 1
+            stats.max_depth = max(stats.max_depth, len(self.marks))
+            if stats.on_update and stats.nodes % stats.interval == 0:
+                stats.publish()
+            start = perf_counter()
+            index = self.select_cell()
+            stats.phase_times["select"] += perf_counter() - start
+
+        if index is None:
+            self.solutions_found += 1
+            if self.solution is None:
+                self.solution = [list(row) for row in self.board]
+            if self.solutions_found >= self.limit:
+                self.done = True
+            return
+        self.stack.append((index, iter(self.order_values(index))))
+
+    def _publish_result(self):
+        self.stats.solutions = self.solutions_found
+        self.stats.publish()
+
+    def _propagate_root(self):
+        if not self.propagation:
+            return True
+        stats = self.stats
+        if stats is None:
+            return propagate(self.domains, self.trail, geometry=self.geometry)
+        start = perf_counter()
+        stats.propagations += 1
+        consistent = propagate(self.domains, self.trail, geometry=self.geometry)
+        stats.phase_times["initial_propagation"] += perf_counter() - start
+        if not consistent:
+            stats.wipeouts += 1
+        return consistent
+
+    def solve(self):
+        return self.count_solutions(limit=1) == 1
@@ -1,57 +1,101 @@
 import random
 
+from propagation import ac3, propagate
+from sudoku_engine import BitmaskSolver
+
+DIFFICULTIES = ("Easy", "Medium", "Hard")
+
+# Most cells hidden per difficulty on a 9x9 board (scaled for other sizes);
+# removal stops earlier when no clue can go
+MAX_HIDDEN = {"Easy": 40, "Medium": 50, "Hard": 64}
+
+
+def grade_puzzle(puzzle):
+    """Grade a puzzle by the techniques needed to solve it.
+
+    Easy:   naked singles (arc consistency) alone solve it
+    Medium: hidden singles are needed as well
+    Hard:   propagation gets stuck and search has to guess
+    """
+    engine = BitmaskSolver(puzzle)
+    domains, tables = engine.domains, engine.geometry
+    popcount = tables.popcount
+    if ac3(domains, [], geometry=tables) and all(popcount[domain] == 1 for domain in domains):
+        return "Easy"
+    if propagate(domains, [], geometry=tables) and all(popcount[domain] == 1 for domain in domains):
+        return "Medium"
+    return "Hard"
+
 
 class SudokuGenerator:
-    def __init__(self):
-        self.puzzle = [[0 for _ in range(9)] for _ in range(9)]
+    def __init__(self, box_size=3, rng=None):
+        # box_size 3 gives the classic 9x9 board, 4 a 16x16 and 5 a 25x25
+        self.box_size = box_size
+        # A random.Random makes the puzzles reproducible from its seed; the
+        # default draws from the global random module
+        self.rng = rng or random
+        self.size = box_size * box_size
+        self.puzzle = [[0 for _ in range(self.size)] for _ in range(self.size)]
         self.solution = None
-        self.hidden_places = 51  # Default number of hidden places
-
-    def is_valid(self, num, row, col):
-        for i in range(9):
-            if self.puzzle[row][i] == num or self.puzzle[i][col] == num:
-                return False
-
-        start_row, start_col = (row // 3) * 3, (col // 3) * 3
-        for i in range(start_row, start_row + 3):
-            for j in range(start_col, start_col + 3):
-                if self.puzzle[i][j] == num:
-                    return False
-
-        return True
-
-    def solve_sudoku(self):
-        for row in range(9):
-            for col in range(9):
-                if self.puzzle[row][col] == 0:
-                    nums = random.sample(range(1, 10), 9)
-                    for num in nums:
-                        if self.is_valid(num, row, col):
-                            self.puzzle[row][col] = num
-                            if self.solve_sudoku():
-                                return True
-                            self.puzzle[row][col] = 0
-                    return False
-        return True
-
-    def generate_puzzle(self, deff):
-        self.solve_sudoku()
-        self.solution = [row[:] for row in self.puzzle]  # Make a deep copy of the solution
-        # Randomly hide numbers in the puzzle
-        hiddens = self.hidden_places
-        if deff == "Easy":
-            hiddens = 25
-        elif deff == "Medium":
-            hiddens = 35
-        elif deff == "Hard":
-            hiddens = 50
-
-        for _ in range(hiddens):
-            row, col = random.randint(0, 8), random.randint(0, 8)
-            while self.puzzle[row][col] == 0:  # Ensure we don't hide an already hidden number
-                row, col = random.randint(0, 8), random.randint(0, 8)
+
+    def fill_grid(self):
+        # The diagonal boxes share no row or column, so random
+        # permutations there are always consistent; the engine completes the rest
+        box_size, size = self.box_size, self.size
+        self.puzzle = [[0 for _ in range(size)] for _ in range(size)]
+        for box in range(box_size):
+            digits = self.rng.sample(range(1, size + 1), size)
+            for i in range(size):
+                self.puzzle[box * box_size + i // box_size][box * box_size + i % box_size] = digits[i]
+        BitmaskSolver(self.puzzle).solve()
+
+    def still_unique(self, row, col, num):
+        # The puzzle had one solution with num at (row, col); after hiding the
+        # clue it stays unique exactly when no solution puts anything else there
+        engine = BitmaskSolver([row[:] for row in self.puzzle])
+        engine.exclude(row, col, num)
+        return engine.count_solutions(limit=1) == 0
+
+    def remove_clues(self, deff):
+        # Hide clues in shuffled order, keeping only removals that leave the
+        # solution unique and do not make the puzzle harder than requested
+        level = DIFFICULTIES.index(deff)
+        total = self.size * self.size
+        max_hidden = MAX_HIDDEN[deff] * total // 81
+        cells = self.rng.sample(range(total), total)
+        hidden = 0
+        current = 0
+        for index in cells:
+            if hidden == max_hidden:
+                break
+            row, col = divmod(index, self.size)
+            num = self.puzzle[row][col]
             self.puzzle[row][col] = 0
-        return self.puzzle
+            # Fewer clues never make propagation stronger, so once the puzzle
+            # needs search every further removal does too
+            grade = current if current == 2 else DIFFICULTIES.index(grade_puzzle(self.puzzle))
+            # Solving by propagation alone already proves the solution is unique,
+            # so only puzzles that need search pay for a uniqueness check
+            if grade <= level and (grade < 2 or self.still_unique(row, col, num)):
+                hidden += 1
+                current = grade
+            else:
+                self.puzzle[row][col] = num
+
+    def generate_puzzle(self, deff="Hard"):
+        # Retry with a fresh grid until the grade matches the difficulty
+        while True:
+            self.fill_grid()
+            self.solution = [row[:] for row in self.puzzle]  # Make a deep copy of the solution
+            self.remove_clues(deff)
+            if grade_puzzle(self.puzzle) == deff:
+                return self.puzzle
+
+    def generate_puzzles(self, deff, count):
+        """Yield count (puzzle, solution) pairs of the given difficulty"""
+        for _ in range(count):
+            puzzle = self.generate_puzzle(deff)
+            yield [row[:] for row in puzzle], self.get_solution()
 
     def get_solution(self):
         return self.solution
@@ -63,4 +107,4 @@ if __name__ == "__main__":
     for row in puzzle:
         print(row)
     print()
-    print("Generated Sudoku:", generator.get_solution())
\ No newline at end of file
+    print("Generated Sudoku:", generator.get_solution())
@@ -0,0 +1,95 @@
+"""Precomputed cell, unit and peer tables for Sudoku variables.
+
+Cells are indexed row-major (``row * size + col``). Domains are ``size``-bit
+masks where bit ``d - 1`` stands for digit ``d``.
+
+``geometry(box_size)`` builds the tables for a board of ``box_size ** 2``
+rows and columns (3 for the classic 9x9, 4 for 16x16, 5 for 25x25); the
+module-level constants are the 9x9 tables.
+"""
+from functools import lru_cache
+from math import isqrt
+
+
+class BitCount:
+    """Stands in for a popcount table too large to precompute"""
+
+    def __getitem__(self, mask):
+        return bin(mask).count("1")
+
+
+class Geometry:
+    def __init__(self, box_size=3):
+        size = box_size * box_size
+        self.box_size = box_size
+        self.size = size
+        self.cells = size * size
+        self.all_candidates = (1 << size) - 1
+
+        # Row, column and box index of every cell
+        self.row_of = tuple(index // size for index in range(self.cells))
+        self.col_of = tuple(index % size for index in range(self.cells))
+        self.box_of = tuple(
+            (index // (size * box_size)) * box_size + (index % size) // box_size
+            for index in range(self.cells)
+        )
+
+        # The units: size rows, size columns, size boxes
+        self.units = (
+            tuple(tuple(row * size + col for col in range(size)) for row in range(size)) +
+            tuple(tuple(row * size + col for row in range(size)) for col in range(size)) +
+            tuple(tuple(index for index in range(self.cells) if self.box_of[index] == box)
+                  for box in range(size))
+        )
+
+        # Indexes into units of the row, column and box of each cell
+        self.units_of = tuple(
+            (self.row_of[index], size + self.col_of[index], 2 * size + self.box_of[index])
+            for index in range(self.cells)
+        )
+
+        # The cells sharing a row, column or box with each cell
+        self.peers = tuple(
+            tuple(sorted(set(cell for unit in self.units_of[index] for cell in self.units[unit]) - {index}))
+            for index in range(self.cells)
+        )
+
+        # Number of candidates in every possible domain mask (up to 16 digits)
+        if size <= 16:
+            self.popcount = tuple(bin(mask).count("1") for mask in range(self.all_candidates + 1))
+        else:
+            self.popcount = BitCount()
+
+
+@lru_cache(maxsize=None)
+def geometry(box_size=3):
+    return Geometry(box_size)
+
+
+def geometry_of(board):
+    """Return the geometry of a square board, given as a list of rows"""
+    box_size = isqrt(len(board))
+    if box_size < 2 or box_size * box_size != len(board) or any(len(row) != len(board) for row in board):
+        raise ValueError(f"Not a Sudoku board: {len(board)} rows")
+    return geometry(box_size)
+
+
+CLASSIC = geometry(3)
+
+ALL_CANDIDATES = CLASSIC.all_candidates  # Digits 1..9 as bits 0..8
+
+ROW_OF = CLASSIC.row_of
+COL_OF = CLASSIC.col_of
+BOX_OF = CLASSIC.box_of
+
+# The 27 units: 9 rows, 9 columns, 9 boxes
+UNITS = CLASSIC.units
+
+# Indexes into UNITS of the row, column and box of each cell
+UNITS_OF = CLASSIC.units_of
+
+# The 20 cells sharing a row, column or box with each cell
+PEERS = CLASSIC.peers
+
+# Number of candidates in every possible domain mask
+POPCOUNT = CLASSIC.popcount
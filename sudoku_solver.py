@@ -4,13 +4,19 @@ import tkinter as tk
 from tkinter import messagebox
 from queue import Queue
 
+from domain_events import DomainEventConsumer, DomainEventQueue
 from helper import generate_domain_array
+from sudoku_api import DEFAULT_BACKEND, make_solver
 from sudoku_domain import SudokuDomain
+from sudoku_engine import DEFAULT_STRATEGY, SearchStats
+from sudoku_index import geometry_of
 
 
-def domain_caller(sudoku_board, sudoku_domain, result_queue):
-    time.sleep(1)  # Simulating some computation time
-    solver = SudokuSolver(sudoku_board, sudoku_domain)
+def domain_caller(sudoku_board, events, result_queue, strategy=DEFAULT_STRATEGY, backend=DEFAULT_BACKEND,
+                  cache=None):
+    # Live search statistics for the domain view's statistics panel
+    stats = SearchStats(on_update=events.update_stats, interval=100) if events else None
+    solver = SudokuSolver(sudoku_board, events, strategy, stats, backend, cache)
     start = time.time()
     if solver.solve():
         end = time.time()
@@ -19,95 +25,114 @@ def domain_caller(sudoku_board, sudoku_domain, result_queue):
             print(row)
         print("execution time :", (end-start) * 10**3, "ms")
         result = solver.board
-        result_queue.put(result)
     else:
         print("No solution exists.")
-        messagebox.showinfo("Unsolvable!", "Your Sudoku is an unsolvable puzzle!")
-        result_queue.put(None)
+        result = None
+    result_queue.put(result)
+    if events:
+        # The consumer shows the outcome from the Tk main loop
+        events.finish(result)
+
+
+def step_caller(root, sudoku_board, events, result_queue, strategy=DEFAULT_STRATEGY, nodes=200):
+    # Run the engine search in slices of nodes assignments from Tk after()
+    # callbacks instead of a thread; the consumer still redraws once per frame
+    stats = SearchStats(on_update=events.update_stats, interval=100)
+    solver = SudokuSolver(sudoku_board, events, strategy, stats)
+    engine = solver.engine
+    engine.begin(limit=1)
+
+    def tick():
+        if engine.step(nodes):
+            result = solver.board if engine.solutions_found else None
+            result_queue.put(result)
+            events.finish(result)
+        else:
+            root.after(1, tick)
+
+    root.after(0, tick)
 
 
 class SudokuSolver:
-    def __init__(self, board, sudoku_domain):
+    def __init__(self, board, events=None, strategy=DEFAULT_STRATEGY, stats=None, backend=DEFAULT_BACKEND,
+                 cache=None):
         self.board = board
-        self.sudoku_domain = sudoku_domain
+        # Domain changes are pushed to the event queue; without one (headless)
+        # no callback is installed and events are dropped entirely. Only the
+        # engine backend reports domain changes and statistics; with the other
+        # backends the view shows the solved board at the end.
+        self.events = events
+        on_change = events.emit if events else None
+        self.stats = stats
+        self.engine = make_solver(board, strategy, backend, stats, on_change)
+        # Shared unit/peer tables of the board size, for is_valid_move
+        self.geometry = geometry_of(board)
+        # Optional solution_cache.SolutionCache consulted before searching 9x9 boards
+        self.cache = cache
 
     def solve(self):
-        # Find the first empty cell in the board
-        empty_cell = self.find_empty_cell()
-
-        # If there are no empty cells, the puzzle is solved
-        if not empty_cell:
+        if self.cache is not None and len(self.board) == 9:
+            # On a hit the cached solution is copied into the board without search
+            solution = self.cache.solve(self.board, self.search)
+            if solution is None:
+                return False
+            for row, solved in zip(self.board, solution):
+                row[:] = solved
             return True
+        return self.engine.solve()
 
-        row, col = empty_cell
+    def search(self, board):
+        # Search is delegated to the selected backend; the default bitmask engine
+        # keeps row, column and box masks up to date and propagates every assignment
+        return [list(row) for row in board] if self.engine.solve() else None
 
-        # Try filling in a digit from 1 to 9
-        for num in range(1, 10):
-            if self.is_valid_move(row, col, num):
-                # If the move is valid, set the cell to the chosen number
-                self.board[row][col] = num
-                # Replace all cells in sudoku_domain after assumption
+    def count_solutions(self, limit=2):
+        # Stops as soon as limit solutions are found; limit=2 checks uniqueness
+        return self.engine.count_solutions(limit)
 
-                self.sudoku_domain.replace_all_cells(generate_domain_array(self.board))
+    def is_valid_move(self, row, col, num):
+        # Check if the chosen number is used by none of the cell's peers
+        board, tables = self.board, self.geometry
+        row_of, col_of = tables.row_of, tables.col_of
+        return all(board[row_of[peer]][col_of[peer]] != num for peer in tables.peers[row * tables.size + col])
 
-                # Recursively try to solve the rest of the puzzle
-                if self.solve():
-                    return True
 
-                # If the puzzle cannot be solved with this choice, backtrack
-                self.board[row][col] = 0
+def show_outcome(result):
+    if result is None:
+        messagebox.showinfo("Unsolvable!", "Your Sudoku is an unsolvable puzzle!")
 
-        # If no valid number can be placed, backtrack to the previous cell
-        return False
 
-    def find_empty_cell(self):
-        # Find the first empty cell in the board
-        for row in range(9):
-            for col in range(9):
-                if self.board[row][col] == 0:
-                    return (row, col)
-        return None
+def run(sudoku_board, strategy=DEFAULT_STRATEGY, headless=False, fps=30, backend=DEFAULT_BACKEND, threaded=True,
+        cache=None):
+    if headless:
+        solver = SudokuSolver(sudoku_board, strategy=strategy, backend=backend, cache=cache)
+        return solver.board if solver.solve() else None
 
-    def is_valid_move(self, row, col, num):
-        # Check if the chosen number is valid for the given cell
-        return (
-                not self.used_in_row(row, num) and
-                not self.used_in_col(col, num) and
-                not self.used_in_box(row - row % 3, col - col % 3, num)
-        )
-
-    def used_in_row(self, row, num):
-        # Check if the number is used in the same row
-        return num in self.board[row]
-
-    def used_in_col(self, col, num):
-        # Check if the number is used in the same column
-        return num in [self.board[i][col] for i in range(9)]
-
-    def used_in_box(self, box_start_row, box_start_col, num):
-        # Check if the number is used in the 3x3 box
-        for i in range(3):
-            for j in range(3):
-                if self.board[i + box_start_row][j + box_start_col] == num:
-                    return True
-        return False
-
-
-def run(sudoku_board):
     root = tk.Tk()
     root.title("Sudoku Solver Test")
     cell_data = generate_domain_array(sudoku_board)
     sudoku_domain = SudokuDomain(root, cell_data)
 
     result_queue = Queue()
-
-    thread = threading.Thread(target=domain_caller, args=(sudoku_board, sudoku_domain, result_queue))
-    thread.start()
+    events = DomainEventQueue()
+    consumer = DomainEventConsumer(root, sudoku_domain, sudoku_board, events, fps, on_finish=show_outcome)
+    consumer.start()
+
+    # Only the engine can pause, other backends always solve on a thread; the
+    # stepped search shows every assignment, so it does not use the cache
+    if threaded or backend != "engine":
+        thread = threading.Thread(target=domain_caller,
+                                  args=(sudoku_board, events, result_queue, strategy, backend, cache))
+        thread.start()
+    else:
+        thread = None
+        step_caller(root, sudoku_board, events, result_queue, strategy)
 
     root.mainloop()
 
     # Wait for the thread to finish
-    thread.join()
+    if thread:
+        thread.join()
 
     # Get the returned value from the queue
     returned_value = result_queue.get()